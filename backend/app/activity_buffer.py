@@ -0,0 +1,153 @@
+"""
+Buffered user-activity logging.
+
+Activity rows used to be inserted and committed one at a time inside the request
+that produced them. Handlers now submit events to an in-process buffer which a
+background task flushes in batches (Mongo insert_many / SQL executemany) when
+ACTIVITY_FLUSH_BATCH_SIZE events are waiting or every
+ACTIVITY_FLUSH_INTERVAL_SECONDS, whichever comes first. The buffer is started and
+drained by the application lifespan; outside of it callers write directly.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import SessionLocal, UserActivity
+from app.mongodb import get_database
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class ActivityBuffer:
+    def __init__(self, name: str, sink: Callable[[List[dict]], Awaitable[None]],
+                 batch_size: int, flush_interval: float, max_pending: int):
+        self.name = name
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake_requested = False
+        self.submitted = 0
+        self.flushed = 0
+        self.overflow = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def submit(self, event: dict) -> bool:
+        """
+        Queue an activity event; safe to call from the event loop or the threadpool.
+        Returns False when the buffer is full and the event was dropped.
+        """
+        event.setdefault("timestamp", datetime.utcnow())
+        with self._lock:
+            if len(self._events) >= self.max_pending:
+                self.overflow += 1
+                return False
+            self._events.append(event)
+            self.submitted += 1
+            wake = len(self._events) >= self.batch_size and not self._wake_requested
+            if wake:
+                self._wake_requested = True
+        if wake and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return True
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=f"{self.name}-flusher")
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while await self.flush():
+            pass
+        self._loop = None
+        logger.info(f"Activity buffer '{self.name}' drained: {self.stats()}")
+
+    async def flush(self) -> int:
+        """Write one batch to the sink; returns the number of events taken"""
+        with self._lock:
+            batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+            self._wake_requested = False
+        if not batch:
+            return 0
+        try:
+            await self.sink(batch)
+            self.flushed += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Activity buffer '{self.name}' failed to flush {len(batch)} events: {e}")
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while await self.flush() == self.batch_size:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._events)
+        return {
+            "name": self.name,
+            "pending": pending,
+            "submitted": self.submitted,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "overflow": self.overflow,
+            "failed": self.failed,
+            "dropped": self.overflow + self.failed,
+        }
+
+async def _insert_mongo_activities(batch: List[dict]):
+    await get_database().user_activities.insert_many(batch, ordered=False)
+
+def _insert_sql_activities(batch: List[dict]):
+    with SessionLocal() as session:
+        session.execute(insert(UserActivity), batch)
+        session.commit()
+
+async def _insert_sql_activities_async(batch: List[dict]):
+    await run_in_threadpool(_insert_sql_activities, batch)
+
+def _buffer(name: str, sink) -> ActivityBuffer:
+    return ActivityBuffer(
+        name,
+        sink,
+        batch_size=settings.ACTIVITY_FLUSH_BATCH_SIZE,
+        flush_interval=settings.ACTIVITY_FLUSH_INTERVAL_SECONDS,
+        max_pending=settings.ACTIVITY_BUFFER_MAX_PENDING,
+    )
+
+mongo_activities = _buffer("mongo_activities", _insert_mongo_activities)
+sql_activities = _buffer("sql_activities", _insert_sql_activities_async)
+
+activity_buffers = (mongo_activities, sql_activities)
@@ -0,0 +1,245 @@
+"""
+AsyncSession counterparts of the crud helpers used by async def SQL routers.
+"""
+import json
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import User, Goods, Branch, Assignment, UserActivity
+from app.schemas import UserCreate, UserUpdate, GoodsCreate, BranchCreate, BranchUpdate, AssignmentCreate, AssignmentUpdate
+from app.auth_handler import get_password_hash_async
+from app.crud import branch_usage_update, dashboard_stats_query, goods_footprint
+from app.pagination import apply_sql_keyset
+from app.load_profiles import DEFAULT_PROFILE, load_options
+from app.principal_cache import sql_principals
+from app.activity_buffer import sql_activities
+from app.stats_cache import DASHBOARD_STATS, stats_cache
+
+# User CRUD
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await db.get(User, user_id)
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                    profile: str = DEFAULT_PROFILE):
+    query = select(User).options(*load_options(User, profile))
+    if cursor is not None:
+        # Keyset mode: seek on (created_at, id) instead of scanning `skip` rows
+        query = apply_sql_keyset(query, User, cursor).limit(limit)
+    else:
+        query = query.offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        hashed_password=await get_password_hash_async(user.password),
+        role=user.role,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        phone=user.phone,
+        address=user.address,
+        branch_id=user.branch_id
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    stats_cache.invalidate(DASHBOARD_STATS)
+    return db_user
+
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate):
+    db_user = await db.get(User, user_id)
+    if db_user:
+        update_data = user_update.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            # Handle JSON serialization for preferences and notification_settings
+            if field in ['preferences', 'notification_settings'] and value is not None:
+                setattr(db_user, field, json.dumps(value))
+            else:
+                setattr(db_user, field, value)
+        await db.commit()
+        await db.refresh(db_user)
+        sql_principals.invalidate_user(db_user.username)
+    return db_user
+
+async def delete_user(db: AsyncSession, user_id: int):
+    db_user = await db.get(User, user_id)
+    if db_user:
+        username = db_user.username
+        await db.delete(db_user)
+        await db.commit()
+        sql_principals.invalidate_user(username)
+        stats_cache.invalidate(DASHBOARD_STATS)
+    return db_user
+
+# Goods CRUD
+async def get_goods(db: AsyncSession, skip: int = 0, limit: int = 100, category: Optional[str] = None,
+                    search: Optional[str] = None, owner_id: Optional[int] = None, branch_id: Optional[int] = None,
+                    cursor: Optional[str] = None, profile: str = DEFAULT_PROFILE):
+    query = select(Goods).options(*load_options(Goods, profile))
+    if category:
+        query = query.where(Goods.category == category)
+    if search:
+        query = query.where(Goods.name.contains(search))
+    if owner_id:
+        query = query.where(Goods.owner_id == owner_id)
+    if branch_id:
+        query = query.where(Goods.branch_id == branch_id)
+    if cursor is not None:
+        # Keyset mode: seek on (created_at, id) instead of scanning `skip` rows
+        query = apply_sql_keyset(query, Goods, cursor).limit(limit)
+    else:
+        query = query.offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_good(db: AsyncSession, good_id: int) -> Optional[Goods]:
+    return await db.get(Goods, good_id)
+
+async def adjust_branch_usage(db: AsyncSession, branch_id: Optional[int], delta: float):
+    """crud.adjust_branch_usage for AsyncSession: applied inside the caller's transaction"""
+    if not branch_id or not delta:
+        return
+    await db.execute(branch_usage_update(branch_id, delta))
+
+async def create_goods(db: AsyncSession, goods: GoodsCreate, owner_id: int):
+    db_goods = Goods(**goods.dict(), owner_id=owner_id)
+    db.add(db_goods)
+    await adjust_branch_usage(db, db_goods.branch_id, goods_footprint(db_goods.quantity, db_goods.unit_volume))
+    await db.commit()
+    await db.refresh(db_goods)
+    stats_cache.invalidate(DASHBOARD_STATS)
+    return db_goods
+
+async def delete_goods(db: AsyncSession, good_id: int):
+    db_goods = await db.get(Goods, good_id)
+    if db_goods:
+        await adjust_branch_usage(db, db_goods.branch_id, -goods_footprint(db_goods.quantity, db_goods.unit_volume))
+        await db.delete(db_goods)
+        await db.commit()
+        stats_cache.invalidate(DASHBOARD_STATS)
+    return db_goods
+
+# Branch CRUD
+async def get_branches(db: AsyncSession, skip: int = 0, limit: int = 100, profile: str = DEFAULT_PROFILE):
+    result = await db.execute(select(Branch).options(*load_options(Branch, profile)).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_branch(db: AsyncSession, branch_id: int) -> Optional[Branch]:
+    return await db.get(Branch, branch_id)
+
+async def create_branch(db: AsyncSession, branch: BranchCreate):
+    db_branch = Branch(**branch.dict())
+    if db_branch.available_space is None:
+        db_branch.available_space = db_branch.capacity
+    db.add(db_branch)
+    await db.commit()
+    await db.refresh(db_branch)
+    stats_cache.invalidate(DASHBOARD_STATS)
+    return db_branch
+
+async def update_branch(db: AsyncSession, branch_id: int, branch_update: BranchUpdate):
+    db_branch = await db.get(Branch, branch_id)
+    if db_branch:
+        update_data = branch_update.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_branch, field, value)
+        if "capacity" in update_data and db_branch.capacity is not None:
+            db_branch.available_space = db_branch.capacity - (db_branch.used_capacity or 0.0)
+        await db.commit()
+        await db.refresh(db_branch)
+    return db_branch
+
+async def delete_branch(db: AsyncSession, branch_id: int):
+    db_branch = await db.get(Branch, branch_id)
+    if db_branch:
+        await db.delete(db_branch)
+        await db.commit()
+        stats_cache.invalidate(DASHBOARD_STATS)
+    return db_branch
+
+# Assignment CRUD
+async def get_assignments(db: AsyncSession, skip: int = 0, limit: int = 100, employee_id: Optional[int] = None,
+                          profile: str = DEFAULT_PROFILE):
+    query = select(Assignment).options(*load_options(Assignment, profile))
+    if employee_id:
+        query = query.where(Assignment.employee_id == employee_id)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_assignment(db: AsyncSession, assignment_id: int) -> Optional[Assignment]:
+    return await db.get(Assignment, assignment_id)
+
+async def create_assignment(db: AsyncSession, assignment: AssignmentCreate):
+    db_assignment = Assignment(**assignment.dict())
+    db.add(db_assignment)
+    await db.commit()
+    await db.refresh(db_assignment)
+    stats_cache.invalidate(DASHBOARD_STATS)
+    return db_assignment
+
+async def update_assignment(db: AsyncSession, assignment_id: int, assignment_update: AssignmentUpdate):
+    db_assignment = await db.get(Assignment, assignment_id)
+    if db_assignment:
+        update_data = assignment_update.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_assignment, field, value)
+        await db.commit()
+        await db.refresh(db_assignment)
+        if "status" in update_data:
+            stats_cache.invalidate(DASHBOARD_STATS)
+    return db_assignment
+
+async def delete_assignment(db: AsyncSession, assignment_id: int):
+    db_assignment = await db.get(Assignment, assignment_id)
+    if db_assignment:
+        await db.delete(db_assignment)
+        await db.commit()
+        stats_cache.invalidate(DASHBOARD_STATS)
+    return db_assignment
+
+# Dashboard Stats
+async def get_dashboard_stats(db: AsyncSession):
+    async def load():
+        return dict((await db.execute(dashboard_stats_query())).one()._mapping)
+    return await stats_cache.get_or_load_async(DASHBOARD_STATS, load)
+
+# User Activity CRUD
+async def get_user_activities(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 50):
+    result = await db.execute(
+        select(UserActivity)
+        .where(UserActivity.user_id == user_id)
+        .order_by(UserActivity.timestamp.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def log_user_activity(db: AsyncSession, user_id: int, action: str, description: str = None, category: str = None,
+                            ip_address: str = None, user_agent: str = None):
+    """Queue an activity row for the next batched flush; written immediately when the buffer is not running"""
+    activity = {
+        "user_id": user_id,
+        "action": action,
+        "description": description,
+        "category": category,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+    }
+    if sql_activities.running:
+        sql_activities.submit(activity)
+        return None
+    db_activity = UserActivity(**activity)
+    db.add(db_activity)
+    await db.commit()
+    await db.refresh(db_activity)
+    return db_activity
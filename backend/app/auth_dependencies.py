@@ -3,13 +3,40 @@ Centralized Authentication & Role Authorization Dependencies for FastAPI Routers
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app import crud
-from app.database import get_db
+from app import async_crud, crud
+from app.database import get_async_db, get_db
 from app.auth_handler import decode_jwt
+from app.principal_cache import sql_principals, token_cache_key
 
 security = HTTPBearer()
 
+def lookup_principal(token: str, payload: dict, db: Session):
+    """Resolve the user behind a decoded token, served from the principal cache when possible."""
+    username = payload.get("sub")
+    key = token_cache_key(token, payload)
+    user = sql_principals.get(key)
+    if user is None:
+        user = crud.get_user_by_username(db, username=username)
+        if user is not None:
+            # Detach so callers get the same kind of principal as from a cache hit
+            db.expunge(user)
+            sql_principals.set(key, username, user, payload.get("exp"))
+    return user
+
+async def lookup_principal_async(token: str, payload: dict, db: AsyncSession):
+    """lookup_principal for AsyncSession-based handlers; shares the same principal cache."""
+    username = payload.get("sub")
+    key = token_cache_key(token, payload)
+    user = sql_principals.get(key)
+    if user is None:
+        user = await async_crud.get_user_by_username(db, username=username)
+        if user is not None:
+            db.expunge(user)
+            sql_principals.set(key, username, user, payload.get("exp"))
+    return user
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -22,7 +49,27 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate token payload",
         )
-    user = crud.get_user_by_username(db, username=username)
+    user = lookup_principal(credentials.credentials, payload, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    return user
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """get_current_user for async def routers (no threadpool hop)."""
+    payload = decode_jwt(credentials.credentials)
+    username = payload.get("sub")
+    if not username:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate token payload",
+        )
+    user = await lookup_principal_async(credentials.credentials, payload, db)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,9 +77,9 @@ def get_current_user(
         )
     return user
 
-def require_roles(allowed_roles: list):
+def require_roles(allowed_roles: list, user_dependency=get_current_user):
     """Dependency factory enforcing user role authorization."""
-    def role_checker(current_user = Depends(get_current_user)):
+    async def role_checker(current_user = Depends(user_dependency)):
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -45,3 +92,5 @@ def require_roles(allowed_roles: list):
 require_admin = require_roles(["admin"])
 require_employee_or_admin = require_roles(["employee", "admin"])
 require_customer = require_roles(["customer"])
+require_admin_async = require_roles(["admin"], get_current_user_async)
+require_employee_or_admin_async = require_roles(["employee", "admin"], get_current_user_async)
@@ -1,3 +1,8 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from jose import jwt
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
@@ -20,10 +25,88 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class PasswordHashingPool:
+    """
+    Bounded worker pool for bcrypt work from async handlers.
+
+    Each hash/verify costs ~250 ms of CPU; running it here keeps the event loop free.
+    When more than `max_queue` jobs are already waiting, new ones are rejected with
+    503 instead of queueing without bound.
+    """
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def run(self, fn, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        self.submitted += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._execute, time.perf_counter(), fn, args)
+        finally:
+            self._pending -= 1
+
+    def _execute(self, enqueued_at: float, fn, args):
+        waited = time.perf_counter() - enqueued_at
+        with self._lock:
+            self._active += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = self._active
+            started = self.completed + active
+            total_wait = self.total_wait_seconds
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": active,
+            "queued": max(0, self._pending - active),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": (total_wait / started * 1000) if started else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+password_pool = PasswordHashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await password_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def create_refresh_token(data: dict):
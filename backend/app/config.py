@@ -18,12 +18,83 @@ try:
         ALGORITHM: str = "HS256"
         ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
         REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+        PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+        PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+        PASSWORD_HASH_WORKERS: int = 4
+        PASSWORD_HASH_MAX_QUEUE: int = 64
 
         # Databases
         DATABASE_URL: str = "sqlite:///./stockhub.db"
         DB_ENGINE: str = "sqlite"
         MONGODB_URL: str = "mongodb://localhost:27017"
         MONGODB_DB_NAME: str = "stockhub"
+        MONGO_ENSURE_INDEXES: bool = True
+        LOW_STOCK_INDEX_CEILING: int = 100
+        LOW_STOCK_WATCHER_ENABLED: bool = False
+        LOW_STOCK_POLL_INTERVAL_SECONDS: float = 30.0
+        DB_POOL_SIZE: int = 10
+        DB_MAX_OVERFLOW: int = 20
+        DB_POOL_TIMEOUT: int = 30
+
+        # SQLite connection profile
+        SQLITE_JOURNAL_MODE: str = "WAL"
+        SQLITE_SYNCHRONOUS: str = "NORMAL"
+        SQLITE_MMAP_SIZE: int = 268435456
+        SQLITE_CACHE_SIZE_KB: int = 65536
+        SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+        # Goods search
+        GOODS_SEARCH_MAX_RESULTS: int = 200
+
+        # Dashboard statistics cache (invalidated on writes)
+        STATS_CACHE_TTL_SECONDS: int = 30
+
+        # Streaming exports (documents fetched per cursor batch)
+        EXPORT_BATCH_SIZE: int = 1000
+
+        # Bulk goods import (rows per insert_many, row errors kept in the report)
+        IMPORT_CHUNK_SIZE: int = 1000
+        IMPORT_MAX_REPORTED_ERRORS: int = 1000
+
+        # Per-request DB instrumentation (Server-Timing header, slow query log with explain plan)
+        QUERY_METRICS_ENABLED: bool = True
+        SLOW_QUERY_THRESHOLD_MS: float = 200.0
+        SLOW_QUERY_EXPLAIN: bool = True
+
+        # Readiness probe (background dependency checks, latency budgets)
+        READINESS_CHECK_INTERVAL_SECONDS: float = 5.0
+        READINESS_CHECK_TIMEOUT_SECONDS: float = 2.0
+        READINESS_SQL_BUDGET_MS: float = 50.0
+        READINESS_MONGO_BUDGET_MS: float = 250.0
+
+        # Production server (serve.py); pool sizes are per worker process
+        SERVER_HOST: str = "0.0.0.0"
+        SERVER_PORT: int = 8000
+        SERVER_WORKERS: int = 0  # 0 = one per available CPU
+        SERVER_MULTIWORKER_CACHE_TTL_SECONDS: int = 5  # principal/stats TTL cap with >1 worker
+        SERVER_LOOP: str = "auto"  # auto (uvloop when installed) | uvloop | asyncio
+        SERVER_HTTP: str = "auto"  # auto (httptools when installed) | httptools | h11
+        SERVER_BACKLOG: int = 2048
+        SERVER_KEEPALIVE_SECONDS: int = 75
+        SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+        SERVER_ACCESS_LOG: bool = False
+        MONGO_MAX_POOL_SIZE: int = 50
+        MONGO_MIN_POOL_SIZE: int = 0
+        THREADPOOL_TOKENS: int = 40
+
+        # File storage
+        STORAGE_BACKEND: str = "cloudinary"
+        LOCAL_STORAGE_DIR: str = "./uploads"
+        CLOUDINARY_CLOUD_NAME: str = ""
+        CLOUDINARY_API_KEY: str = ""
+        CLOUDINARY_API_SECRET: str = ""
+        UPLOAD_CHUNK_SIZE: int = 6 * 1024 * 1024
+
+        # User activity logging
+        ACTIVITY_BUFFER_ENABLED: bool = True
+        ACTIVITY_FLUSH_BATCH_SIZE: int = 500
+        ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 1.0
+        ACTIVITY_BUFFER_MAX_PENDING: int = 50000
 
         # CORS
         CORS_ORIGINS: List[str] = [
@@ -50,11 +121,72 @@ except ImportError:
         ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
         ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
         REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+        PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+        PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+        PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+        PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
 
         DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./stockhub.db")
         DB_ENGINE: str = os.getenv("DB_ENGINE", "sqlite")
         MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
         MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "stockhub")
+        MONGO_ENSURE_INDEXES: bool = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+        LOW_STOCK_INDEX_CEILING: int = int(os.getenv("LOW_STOCK_INDEX_CEILING", "100"))
+        LOW_STOCK_WATCHER_ENABLED: bool = os.getenv("LOW_STOCK_WATCHER_ENABLED", "false").lower() == "true"
+        LOW_STOCK_POLL_INTERVAL_SECONDS: float = float(os.getenv("LOW_STOCK_POLL_INTERVAL_SECONDS", "30"))
+        DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+        DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+        SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+        SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+        SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+        SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+        GOODS_SEARCH_MAX_RESULTS: int = int(os.getenv("GOODS_SEARCH_MAX_RESULTS", "200"))
+
+        STATS_CACHE_TTL_SECONDS: int = int(os.getenv("STATS_CACHE_TTL_SECONDS", "30"))
+
+        EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+        IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+        IMPORT_MAX_REPORTED_ERRORS: int = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
+        QUERY_METRICS_ENABLED: bool = os.getenv("QUERY_METRICS_ENABLED", "true").lower() == "true"
+        SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+        SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+        READINESS_CHECK_INTERVAL_SECONDS: float = float(os.getenv("READINESS_CHECK_INTERVAL_SECONDS", "5"))
+        READINESS_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("READINESS_CHECK_TIMEOUT_SECONDS", "2"))
+        READINESS_SQL_BUDGET_MS: float = float(os.getenv("READINESS_SQL_BUDGET_MS", "50"))
+        READINESS_MONGO_BUDGET_MS: float = float(os.getenv("READINESS_MONGO_BUDGET_MS", "250"))
+
+        SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+        SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+        SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))
+        SERVER_MULTIWORKER_CACHE_TTL_SECONDS: int = int(os.getenv("SERVER_MULTIWORKER_CACHE_TTL_SECONDS", "5"))
+        SERVER_LOOP: str = os.getenv("SERVER_LOOP", "auto")
+        SERVER_HTTP: str = os.getenv("SERVER_HTTP", "auto")
+        SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+        SERVER_KEEPALIVE_SECONDS: int = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75"))
+        SERVER_GRACEFUL_TIMEOUT_SECONDS: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+        SERVER_ACCESS_LOG: bool = os.getenv("SERVER_ACCESS_LOG", "false").lower() == "true"
+        MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+        MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+        THREADPOOL_TOKENS: int = int(os.getenv("THREADPOOL_TOKENS", "40"))
+
+        STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "cloudinary")
+        LOCAL_STORAGE_DIR: str = os.getenv("LOCAL_STORAGE_DIR", "./uploads")
+        CLOUDINARY_CLOUD_NAME: str = os.getenv("CLOUDINARY_CLOUD_NAME", "")
+        CLOUDINARY_API_KEY: str = os.getenv("CLOUDINARY_API_KEY", "")
+        CLOUDINARY_API_SECRET: str = os.getenv("CLOUDINARY_API_SECRET", "")
+        UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(6 * 1024 * 1024)))
+
+        ACTIVITY_BUFFER_ENABLED: bool = os.getenv("ACTIVITY_BUFFER_ENABLED", "true").lower() == "true"
+        ACTIVITY_FLUSH_BATCH_SIZE: int = int(os.getenv("ACTIVITY_FLUSH_BATCH_SIZE", "500"))
+        ACTIVITY_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("ACTIVITY_FLUSH_INTERVAL_SECONDS", "1.0"))
+        ACTIVITY_BUFFER_MAX_PENDING: int = int(os.getenv("ACTIVITY_BUFFER_MAX_PENDING", "50000"))
 
         CORS_ORIGINS: List[str] = [
             origin.strip()
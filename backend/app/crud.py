@@ -1,10 +1,18 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select, update
 from app.database import User, Goods, Branch, Assignment, UserActivity
 from app.schemas import UserCreate, UserUpdate, GoodsCreate, GoodsUpdate, BranchCreate, BranchUpdate, AssignmentCreate, AssignmentUpdate, UserActivityCreate
 from app.auth_handler import get_password_hash, verify_password
+from app.pagination import apply_sql_keyset
+from app.load_profiles import DEFAULT_PROFILE, load_options
+from app.principal_cache import sql_principals
+from app.activity_buffer import sql_activities
+from app.stats_cache import DASHBOARD_STATS, stats_cache
 from typing import Optional, List
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 # User CRUD
 def get_user(db: Session, user_id: int):
@@ -16,8 +24,13 @@ def get_user_by_username(db: Session, username: str):
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+              profile: str = DEFAULT_PROFILE):
+    query = db.query(User).options(*load_options(User, profile))
+    if cursor is not None:
+        # Keyset mode: seek on (created_at, id) instead of scanning `skip` rows
+        return apply_sql_keyset(query, User, cursor).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 def create_user(db: Session, user: UserCreate):
     hashed_password = get_password_hash(user.password)
@@ -35,6 +48,7 @@ def create_user(db: Session, user: UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    stats_cache.invalidate(DASHBOARD_STATS)
     return db_user
 
 def update_user(db: Session, user_id: int, user_update: UserUpdate):
@@ -50,57 +64,139 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate):
                 setattr(db_user, field, value)
         db.commit()
         db.refresh(db_user)
+        sql_principals.invalidate_user(db_user.username)
     return db_user
 
 def delete_user(db: Session, user_id: int):
     db_user = db.query(User).filter(User.id == user_id).first()
     if db_user:
+        username = db_user.username
         db.delete(db_user)
         db.commit()
+        sql_principals.invalidate_user(username)
+        stats_cache.invalidate(DASHBOARD_STATS)
     return db_user
 
 def authenticate_user(db: Session, username: str, password: str):
-    print(f"[DEBUG] Authenticating user: {username}")
     user = get_user_by_username(db, username)
     if not user:
-        print(f"[DEBUG] User not found: {username}")
+        logger.debug(f"Authentication failed, unknown user: {username}")
         return False
-    print(f"[DEBUG] User found: {user.username}, role: {user.role}")
-    password_valid = verify_password(password, user.hashed_password)
-    print(f"[DEBUG] Password verification result: {password_valid}")
-    if not password_valid:
+    if not verify_password(password, user.hashed_password):
+        logger.debug(f"Authentication failed, bad password: {username}")
         return False
-    print(f"[DEBUG] Authentication successful for user: {username}")
+    logger.debug(f"Authenticated user {username} (role: {user.role})")
     return user
 
 # Goods CRUD
-def get_goods(db: Session, skip: int = 0, limit: int = 100, category: Optional[str] = None, search: Optional[str] = None):
-    query = db.query(Goods)
+def get_goods(db: Session, skip: int = 0, limit: int = 100, category: Optional[str] = None, search: Optional[str] = None,
+              owner_id: Optional[int] = None, branch_id: Optional[int] = None, cursor: Optional[str] = None,
+              profile: str = DEFAULT_PROFILE):
+    query = db.query(Goods).options(*load_options(Goods, profile))
     if category:
         query = query.filter(Goods.category == category)
     if search:
         query = query.filter(Goods.name.contains(search))
+    if owner_id:
+        query = query.filter(Goods.owner_id == owner_id)
+    if branch_id:
+        query = query.filter(Goods.branch_id == branch_id)
+    if cursor is not None:
+        # Keyset mode: seek on (created_at, id) instead of scanning `skip` rows
+        return apply_sql_keyset(query, Goods, cursor).limit(limit).all()
     return query.offset(skip).limit(limit).all()
 
-def get_goods_by_owner(db: Session, owner_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Goods).filter(Goods.owner_id == owner_id).offset(skip).limit(limit).all()
+def get_goods_by_owner(db: Session, owner_id: int, skip: int = 0, limit: int = 100, profile: str = DEFAULT_PROFILE):
+    query = db.query(Goods).options(*load_options(Goods, profile))
+    return query.filter(Goods.owner_id == owner_id).offset(skip).limit(limit).all()
 
 def get_good(db: Session, good_id: int):
     return db.query(Goods).filter(Goods.id == good_id).first()
 
+def goods_footprint(quantity: Optional[int], unit_volume: Optional[float]) -> float:
+    """Branch capacity occupied by a goods row"""
+    return (quantity or 0) * (unit_volume if unit_volume is not None else 1.0)
+
+def branch_usage_update(branch_id: int, delta: float):
+    """
+    UPDATE applying a used-capacity delta to a branch (run by the sync and async sessions).
+    available_space is kept in step; both are computed in SQL from the current row.
+    """
+    return (
+        update(Branch)
+        .where(Branch.id == branch_id)
+        .values(
+            used_capacity=Branch.used_capacity + delta,
+            available_space=Branch.capacity - (Branch.used_capacity + delta),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def adjust_branch_usage(db: Session, branch_id: Optional[int], delta: float):
+    """Apply a used-capacity delta to a branch inside the caller's transaction"""
+    if not branch_id or not delta:
+        return
+    db.execute(branch_usage_update(branch_id, delta))
+
+def get_branch_used_capacity(db: Session, branch_id: int) -> float:
+    """O(1) read of the incrementally maintained counter"""
+    used = db.query(Branch.used_capacity).filter(Branch.id == branch_id).scalar()
+    return used or 0.0
+
+def compute_branch_used_capacity(db: Session) -> dict:
+    """Recompute used capacity from scratch: {branch_id: sum(quantity * unit_volume)}"""
+    rows = db.query(
+        Goods.branch_id,
+        func.coalesce(func.sum(Goods.quantity * func.coalesce(Goods.unit_volume, 1.0)), 0.0),
+    ).filter(Goods.branch_id.isnot(None)).group_by(Goods.branch_id).all()
+    return {branch_id: float(used) for branch_id, used in rows}
+
+def reconcile_branch_capacity(db: Session, apply: bool = True, tolerance: float = 1e-6) -> List[dict]:
+    """Compare every branch counter with a full recomputation; optionally repair drift"""
+    actual_usage = compute_branch_used_capacity(db)
+    drift = []
+    for branch in db.query(Branch).all():
+        recorded = branch.used_capacity or 0.0
+        actual = actual_usage.get(branch.id, 0.0)
+        if abs(recorded - actual) > tolerance:
+            drift.append({
+                "branch_id": branch.id,
+                "name": branch.name,
+                "recorded": recorded,
+                "actual": actual,
+                "drift": recorded - actual,
+            })
+            if apply:
+                branch.used_capacity = actual
+                if branch.capacity is not None:
+                    branch.available_space = branch.capacity - actual
+    if apply and drift:
+        db.commit()
+    return drift
+
 def create_goods(db: Session, goods: GoodsCreate, owner_id: int):
     db_goods = Goods(**goods.dict(), owner_id=owner_id)
     db.add(db_goods)
+    adjust_branch_usage(db, db_goods.branch_id, goods_footprint(db_goods.quantity, db_goods.unit_volume))
     db.commit()
     db.refresh(db_goods)
+    stats_cache.invalidate(DASHBOARD_STATS)
     return db_goods
 
 def update_goods(db: Session, good_id: int, goods_update: GoodsUpdate):
     db_goods = db.query(Goods).filter(Goods.id == good_id).first()
     if db_goods:
+        previous_branch_id = db_goods.branch_id
+        previous_footprint = goods_footprint(db_goods.quantity, db_goods.unit_volume)
         update_data = goods_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_goods, field, value)
+        footprint = goods_footprint(db_goods.quantity, db_goods.unit_volume)
+        if db_goods.branch_id == previous_branch_id:
+            adjust_branch_usage(db, previous_branch_id, footprint - previous_footprint)
+        else:
+            adjust_branch_usage(db, previous_branch_id, -previous_footprint)
+            adjust_branch_usage(db, db_goods.branch_id, footprint)
         db.commit()
         db.refresh(db_goods)
     return db_goods
@@ -108,22 +204,27 @@ def update_goods(db: Session, good_id: int, goods_update: GoodsUpdate):
 def delete_goods(db: Session, good_id: int):
     db_goods = db.query(Goods).filter(Goods.id == good_id).first()
     if db_goods:
+        adjust_branch_usage(db, db_goods.branch_id, -goods_footprint(db_goods.quantity, db_goods.unit_volume))
         db.delete(db_goods)
         db.commit()
+        stats_cache.invalidate(DASHBOARD_STATS)
     return db_goods
 
 # Branch CRUD
-def get_branches(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Branch).offset(skip).limit(limit).all()
+def get_branches(db: Session, skip: int = 0, limit: int = 100, profile: str = DEFAULT_PROFILE):
+    return db.query(Branch).options(*load_options(Branch, profile)).offset(skip).limit(limit).all()
 
 def get_branch(db: Session, branch_id: int):
     return db.query(Branch).filter(Branch.id == branch_id).first()
 
 def create_branch(db: Session, branch: BranchCreate):
     db_branch = Branch(**branch.dict())
+    if db_branch.available_space is None:
+        db_branch.available_space = db_branch.capacity
     db.add(db_branch)
     db.commit()
     db.refresh(db_branch)
+    stats_cache.invalidate(DASHBOARD_STATS)
     return db_branch
 
 def update_branch(db: Session, branch_id: int, branch_update: BranchUpdate):
@@ -132,6 +233,8 @@ def update_branch(db: Session, branch_id: int, branch_update: BranchUpdate):
         update_data = branch_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_branch, field, value)
+        if "capacity" in update_data and db_branch.capacity is not None:
+            db_branch.available_space = db_branch.capacity - (db_branch.used_capacity or 0.0)
         db.commit()
         db.refresh(db_branch)
     return db_branch
@@ -141,11 +244,13 @@ def delete_branch(db: Session, branch_id: int):
     if db_branch:
         db.delete(db_branch)
         db.commit()
+        stats_cache.invalidate(DASHBOARD_STATS)
     return db_branch
 
 # Assignment CRUD
-def get_assignments(db: Session, skip: int = 0, limit: int = 100, employee_id: Optional[int] = None):
-    query = db.query(Assignment)
+def get_assignments(db: Session, skip: int = 0, limit: int = 100, employee_id: Optional[int] = None,
+                    profile: str = DEFAULT_PROFILE):
+    query = db.query(Assignment).options(*load_options(Assignment, profile))
     if employee_id:
         query = query.filter(Assignment.employee_id == employee_id)
     return query.offset(skip).limit(limit).all()
@@ -158,6 +263,7 @@ def create_assignment(db: Session, assignment: AssignmentCreate):
     db.add(db_assignment)
     db.commit()
     db.refresh(db_assignment)
+    stats_cache.invalidate(DASHBOARD_STATS)
     return db_assignment
 
 def update_assignment(db: Session, assignment_id: int, assignment_update: AssignmentUpdate):
@@ -168,6 +274,8 @@ def update_assignment(db: Session, assignment_id: int, assignment_update: Assign
             setattr(db_assignment, field, value)
         db.commit()
         db.refresh(db_assignment)
+        if "status" in update_data:
+            stats_cache.invalidate(DASHBOARD_STATS)
     return db_assignment
 
 def delete_assignment(db: Session, assignment_id: int):
@@ -175,23 +283,26 @@ def delete_assignment(db: Session, assignment_id: int):
     if db_assignment:
         db.delete(db_assignment)
         db.commit()
+        stats_cache.invalidate(DASHBOARD_STATS)
     return db_assignment
 
 # Dashboard Stats
+def dashboard_stats_query():
+    """All dashboard counters in one round trip (one scalar subquery per table)"""
+    return select(
+        select(func.count(User.id)).scalar_subquery().label("total_users"),
+        select(func.count(Goods.id)).scalar_subquery().label("total_goods"),
+        select(func.count(Branch.id)).scalar_subquery().label("total_branches"),
+        select(func.count(Assignment.id)).scalar_subquery().label("total_assignments"),
+        select(func.coalesce(func.sum(case((Assignment.status == "pending", 1), else_=0)), 0))
+            .scalar_subquery().label("pending_assignments"),
+    )
+
+def _query_dashboard_stats(db: Session):
+    return dict(db.execute(dashboard_stats_query()).one()._mapping)
+
 def get_dashboard_stats(db: Session):
-    total_users = db.query(func.count(User.id)).scalar()
-    total_goods = db.query(func.count(Goods.id)).scalar()
-    total_branches = db.query(func.count(Branch.id)).scalar()
-    total_assignments = db.query(func.count(Assignment.id)).scalar()
-    pending_assignments = db.query(func.count(Assignment.id)).filter(Assignment.status == "pending").scalar()
-    
-    return {
-"total_users": total_users,
-"total_goods": total_goods,
-"total_branches": total_branches,
-"total_assignments": total_assignments,
-"pending_assignments": pending_assignments
-    }
+    return stats_cache.get_or_load(DASHBOARD_STATS, lambda: _query_dashboard_stats(db))
 
 # User Activity CRUD
 def create_user_activity(db: Session, activity: UserActivityCreate):
@@ -205,6 +316,17 @@ def get_user_activities(db: Session, user_id: int, skip: int = 0, limit: int = 5
     return db.query(UserActivity).filter(UserActivity.user_id == user_id).order_by(UserActivity.timestamp.desc()).offset(skip).limit(limit).all()
 
 def log_user_activity(db: Session, user_id: int, action: str, description: str = None, category: str = None, ip_address: str = None, user_agent: str = None):
+    """Queue an activity row for the next batched flush; written immediately when the buffer is not running"""
+    if sql_activities.running:
+        sql_activities.submit({
+            "user_id": user_id,
+            "action": action,
+            "description": description,
+            "category": category,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+        })
+        return None
     activity = UserActivityCreate(
 user_id=user_id,
 action=action,
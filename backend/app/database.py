@@ -1,15 +1,79 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from app.config import get_settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./stockhub.db"
+settings = get_settings()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+def sqlite_pragmas() -> dict:
+    """Per-connection SQLite tuning: WAL lets readers proceed while a writer commits"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # negative = KiB rather than pages
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "temp_store": "MEMORY",
+    }
+
+def _pool_options(url: str) -> dict:
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}  # in-memory databases keep SQLAlchemy's single-connection pool
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if not url.startswith("sqlite"):
+        options["pool_pre_ping"] = True
+    return options
+
+def _register_sqlite_pragmas(sync_engine, pragmas: dict):
+    @event.listens_for(sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def build_engine(url: str, pragmas: dict = None):
+    """Create an engine with a sized pool; SQLite connections get the pragma profile on connect"""
+    options = _pool_options(url)
+    if not url.startswith("sqlite"):
+        return create_engine(url, **options)
+    sqlite_engine = create_engine(url, connect_args={"check_same_thread": False}, **options)
+    _register_sqlite_pragmas(sqlite_engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return sqlite_engine
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    scheme, separator, rest = url.partition(":")
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+def build_async_engine(url: str, pragmas: dict = None):
+    """Async counterpart of build_engine, sharing its pool sizing and SQLite pragma profile"""
+    async_url = async_database_url(url)
+    async_sqlite_engine = create_async_engine(async_url, **_pool_options(url))
+    if async_url.startswith("sqlite"):
+        _register_sqlite_pragmas(async_sqlite_engine.sync_engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return async_sqlite_engine
+
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async path for async def handlers: no threadpool hop per request
+async_engine = build_async_engine(SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 class User(Base):
@@ -42,6 +106,9 @@ class User(Base):
     goods = relationship("Goods", back_populates="owner")
     assignments = relationship("Assignment", back_populates="employee")
     branch = relationship("Branch", back_populates="users", foreign_keys=[branch_id])
+    
+    # Keyset pagination index (created_at, id)
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
 class Goods(Base):
     __tablename__ = "goods"
@@ -52,6 +119,7 @@ class Goods(Base):
     category = Column(String)
     quantity = Column(Integer)
     price_per_unit = Column(Float)
+    unit_volume = Column(Float, default=1.0, nullable=False)  # capacity units per item
     owner_id = Column(Integer, ForeignKey("users.id"))
     branch_id = Column(Integer, ForeignKey("branches.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -61,6 +129,9 @@ class Goods(Base):
     # Relationships
     owner = relationship("User", back_populates="goods")
     branch = relationship("Branch", back_populates="goods")
+    
+    # Keyset pagination index (created_at, id)
+    __table_args__ = (Index("ix_goods_created_at_id", "created_at", "id"),)
 
 class Branch(Base):
     __tablename__ = "branches"
@@ -72,7 +143,8 @@ class Branch(Base):
     image_url = Column(String)
     manager_id = Column(Integer, ForeignKey("users.id"))
     capacity = Column(Integer)
-    available_space = Column(Integer)
+    available_space = Column(Float)  # capacity - used_capacity; fractional with fractional unit volumes
+    used_capacity = Column(Float, default=0.0, nullable=False)  # sum(quantity * unit_volume), maintained on writes
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -158,6 +230,9 @@ class CustomerApplication(Base):
     
     # Relationships
     reviewer = relationship("User", foreign_keys=[reviewed_by])
+    
+    # Keyset pagination index (created_at, id)
+    __table_args__ = (Index("ix_customer_applications_created_at_id", "created_at", "id"),)
 
 def get_db():
     db = SessionLocal()
@@ -165,3 +240,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
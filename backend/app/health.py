@@ -0,0 +1,112 @@
+"""
+Background dependency health for the readiness probe.
+
+ReadinessMonitor pings the SQL database and MongoDB every READINESS_CHECK_INTERVAL_SECONDS
+from one task and caches the outcome, so /readyz only reads a dict: probes from
+any number of kubelets never reach the databases. A dependency is "degraded"
+when it answers slower than its latency budget (still ready) and "down" when it
+fails or times out (not ready). Results older than a few intervals count as down.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database import async_engine
+from app.mongodb import mongodb
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STALE_AFTER_INTERVALS = 3
+
+async def check_sql():
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def check_mongo():
+    if mongodb.client is None:
+        raise RuntimeError("MongoDB client is not connected")
+    await mongodb.client.admin.command("ping")
+
+class ReadinessMonitor:
+    def __init__(self, checks: Dict[str, Callable[[], Awaitable]], budgets_ms: Dict[str, float],
+                 interval: float, timeout: float):
+        self.checks = checks
+        self.budgets_ms = budgets_ms
+        self.interval = interval
+        self.timeout = timeout
+        self.draining = False
+        self._results: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _check(self, name: str, check) -> dict:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except Exception as e:
+            error = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+            return {"status": "down", "latency_ms": None, "error": error, "checked_at": time.time()}
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        status = "degraded" if latency_ms > self.budgets_ms.get(name, float("inf")) else "up"
+        return {"status": status, "latency_ms": latency_ms, "budget_ms": self.budgets_ms.get(name),
+                "checked_at": time.time()}
+
+    async def check_now(self):
+        """Run every check concurrently and replace the cached results"""
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._check(name, self.checks[name]) for name in names))
+        for name, result in zip(names, results):
+            previous = self._results.get(name, {}).get("status")
+            if previous != result["status"]:
+                log = logger.info if result["status"] == "up" else logger.warning
+                log(f"Dependency {name} is {result['status']}" + (f": {result['error']}" if "error" in result else ""))
+        self._results = dict(zip(names, results))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check_now()
+            except Exception as e:
+                logger.warning(f"Readiness check failed: {e}")
+
+    async def start(self):
+        """Check once so the first probe has an answer, then keep checking in the background"""
+        self.draining = False
+        await self.check_now()
+        self._task = asyncio.create_task(self._run(), name="readiness-monitor")
+
+    async def stop(self):
+        # Report not ready while shutting down so traffic drains away first
+        self.draining = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        """Cached dependency states; stale results are reported as down"""
+        stale_before = time.time() - self.interval * STALE_AFTER_INTERVALS
+        dependencies = {}
+        for name in self.checks:
+            result = dict(self._results.get(name) or {"status": "down", "error": "not checked yet", "checked_at": None})
+            if result["checked_at"] is not None and result["checked_at"] < stale_before:
+                result["status"] = "down"
+                result["error"] = "stale result"
+            dependencies[name] = result
+        ready = not self.draining and all(result["status"] != "down" for result in dependencies.values())
+        return {"ready": ready, "draining": self.draining, "dependencies": dependencies}
+
+readiness_monitor = ReadinessMonitor(
+    checks={"sql": check_sql, "mongodb": check_mongo},
+    budgets_ms={"sql": settings.READINESS_SQL_BUDGET_MS, "mongodb": settings.READINESS_MONGO_BUDGET_MS},
+    interval=settings.READINESS_CHECK_INTERVAL_SECONDS,
+    timeout=settings.READINESS_CHECK_TIMEOUT_SECONDS,
+)
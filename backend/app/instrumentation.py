@@ -0,0 +1,296 @@
+"""
+Per-request database instrumentation for SQLAlchemy and Motor.
+
+SQLAlchemy cursor events and a pymongo CommandListener attribute every
+statement/command to the request being served (tracked in a ContextVar, which
+run_in_threadpool and Motor's executor copy into worker threads). The totals
+go out as a Server-Timing header and one structured log line per request.
+Anything slower than SLOW_QUERY_THRESHOLD_MS is logged with its explain plan.
+Bound values (password hashes, emails, tokens) never reach the logs: SQL
+parameters are logged by type only, Mongo commands and plans with values masked.
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import orjson
+from pymongo import monitoring
+from sqlalchemy import event
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("app.requests")
+settings = get_settings()
+
+STATEMENT_LOG_LENGTH = 500
+EXPLAINABLE_SQL = ("SELECT", "WITH")
+EXPLAINABLE_MONGO = ("find", "aggregate", "count", "distinct")
+MONGO_PLAN_FILTERS = ("filter", "indexBounds")  # hold the query's literal values
+
+class RequestMetrics:
+    __slots__ = ("sql_count", "sql_ms", "mongo_count", "mongo_ms", "slowest_ms", "slowest")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.mongo_count = 0
+        self.mongo_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest: Optional[str] = None
+
+    def record_sql(self, elapsed_ms: float, statement: str):
+        self.sql_count += 1
+        self.sql_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms, self.slowest = elapsed_ms, statement
+
+    def record_mongo(self, elapsed_ms: float, command: str):
+        self.mongo_count += 1
+        self.mongo_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms, self.slowest = elapsed_ms, command
+
+    def server_timing(self, total_ms: float) -> str:
+        return (
+            f'sql;dur={self.sql_ms:.1f};desc="{self.sql_count} queries", '
+            f'mongo;dur={self.mongo_ms:.1f};desc="{self.mongo_count} commands", '
+            f"total;dur={total_ms:.1f}"
+        )
+
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current_metrics.get()
+
+def _short(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= STATEMENT_LOG_LENGTH else statement[:STATEMENT_LOG_LENGTH] + "..."
+
+def _param_types(parameters, executemany: bool) -> str:
+    """Loggable summary of bound SQL parameters: their types, never their values"""
+    if executemany:
+        return f"{len(parameters)} rows"
+    values = parameters.values() if isinstance(parameters, dict) else (parameters or ())
+    return "(" + ", ".join(type(value).__name__ for value in values) + ")"
+
+def _mask_values(value):
+    """Mongo command shape with every literal replaced by its type name"""
+    if isinstance(value, dict):
+        return {key: _mask_values(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_mask_values(item) for item in value]
+    return f"<{type(value).__name__}>"
+
+def _mask_plan(plan):
+    """Mongo winning plan with the literals in its filters and index bounds masked"""
+    if isinstance(plan, dict):
+        return {key: _mask_values(item) if key in MONGO_PLAN_FILTERS else _mask_plan(item) for key, item in plan.items()}
+    if isinstance(plan, list):
+        return [_mask_plan(item) for item in plan]
+    return plan
+
+# SQLAlchemy
+
+def _explain_sql(conn, statement: str, parameters):
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # Raw DBAPI cursor so the explain doesn't re-enter these events
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [tuple(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.record_sql(elapsed_ms, _short(statement))
+    if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    plan = None
+    if settings.SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE_SQL):
+        try:
+            plan = _explain_sql(conn, statement, parameters)
+        except Exception as e:
+            logger.debug(f"Could not explain slow query: {e}")
+    logger.warning(f"Slow SQL query ({elapsed_ms:.1f}ms): {_short(statement)} "
+                   f"params={_param_types(parameters, executemany)} plan={plan}")
+
+def instrument_engine(sync_engine):
+    """Attach the timing hooks to an Engine (for AsyncEngine pass `.sync_engine`)"""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+# Motor / pymongo
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Attributes commands to the request that issued them.
+
+    Events for one command arrive on the thread that ran it; the started event
+    still sees the request context, so the metrics are looked up there and
+    carried over to the succeeded/failed event by (connection, request id).
+    """
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop, client):
+        """Event loop and Motor client used to run explains of slow commands"""
+        self._loop = loop
+        self._client = client
+
+    def started(self, event):
+        explainable = settings.SLOW_QUERY_EXPLAIN and event.command_name in EXPLAINABLE_MONGO
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                _current_metrics.get(), event.database_name, event.command if explainable else None
+            )
+
+    def _finished(self, event):
+        with self._lock:
+            metrics, database_name, command = self._pending.pop((event.connection_id, event.request_id), (None, "", None))
+        elapsed_ms = event.duration_micros / 1000
+        if metrics is not None:
+            metrics.record_mongo(elapsed_ms, f"{database_name}.{event.command_name}")
+        if elapsed_ms >= settings.SLOW_QUERY_THRESHOLD_MS and event.command_name not in ("explain", "getMore"):
+            logger.warning(f"Slow MongoDB command ({elapsed_ms:.1f}ms): {database_name}.{event.command_name}")
+            if command is not None:
+                self._schedule_explain(database_name, command)
+
+    succeeded = _finished
+    failed = _finished
+
+    def _schedule_explain(self, database_name: str, command: dict):
+        if self._loop is None or self._client is None or self._loop.is_closed():
+            return
+        # Listeners must not block; run the explain on the event loop instead
+        explained = {k: v for k, v in command.items() if k not in ("lsid", "txnNumber") and not k.startswith("$")}
+        explain = {"explain": explained, "verbosity": "queryPlanner"}
+        self._loop.call_soon_threadsafe(self._loop.create_task, self._explain(database_name, explain))
+
+    async def _explain(self, database_name: str, explain: dict):
+        try:
+            result = await self._client[database_name].command(explain)
+            plan = _mask_plan(result.get("queryPlanner", {}).get("winningPlan", result.get("stages")))
+            command = _short(str(_mask_values(explain["explain"])))
+            logger.warning(f"Slow MongoDB command plan: command={command} plan={plan}")
+        except Exception as e:
+            logger.debug(f"Could not explain slow MongoDB command: {e}")
+
+mongo_command_listener = MongoCommandListener()
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Connection pool occupancy across all servers, read by /metrics"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+
+    def _add(self, attribute: str, delta: int):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + delta)
+
+    def connection_created(self, event):
+        self._add("open", 1)
+
+    def connection_closed(self, event):
+        self._add("open", -1)
+
+    def connection_check_out_started(self, event):
+        self._add("waiting", 1)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "checkout_failures": self.checkout_failures,
+            }
+
+mongo_pool_listener = MongoPoolListener()
+
+# ASGI middleware
+
+class QueryMetricsMiddleware:
+    """Scopes a RequestMetrics to each HTTP request; adds Server-Timing and logs the totals"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.QUERY_METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", metrics.server_timing(total_ms).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_metrics.reset(token)
+            request_logger.info(orjson.dumps({
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "sql_queries": metrics.sql_count,
+                "sql_ms": round(metrics.sql_ms, 2),
+                "mongo_commands": metrics.mongo_count,
+                "mongo_ms": round(metrics.mongo_ms, 2),
+                "slowest_ms": round(metrics.slowest_ms, 2),
+                "slowest": metrics.slowest,
+            }).decode())
@@ -0,0 +1,40 @@
+"""
+Named relationship loading profiles for the SQL list queries.
+
+The response schemas are flat (foreign key ids only), so the default "summary"
+profile makes any relationship access raise instead of firing one lazy SELECT
+per row. "detailed" eager-loads the relationships in a fixed number of
+statements for callers that do walk them.
+"""
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from app.database import Assignment, Branch, Goods, User
+
+DEFAULT_PROFILE = "summary"
+
+# sql_only: objects already in the identity map can still be reached
+_NO_LAZY_LOADS = (raiseload("*", sql_only=True),)
+
+LOAD_PROFILES = {
+    "summary": {
+        User: _NO_LAZY_LOADS,
+        Goods: _NO_LAZY_LOADS,
+        Branch: _NO_LAZY_LOADS,
+        Assignment: _NO_LAZY_LOADS,
+    },
+    "detailed": {
+        # Many rows share few owners/branches: one IN query per relationship
+        User: (selectinload(User.branch),),
+        Goods: (selectinload(Goods.owner), selectinload(Goods.branch)),
+        # One manager per branch: join it into the listing query
+        Branch: (joinedload(Branch.manager),),
+        Assignment: (selectinload(Assignment.employee), selectinload(Assignment.branch)),
+    },
+}
+
+def load_options(model, profile: str = DEFAULT_PROFILE) -> tuple:
+    """Loader options for `model` under the named profile"""
+    try:
+        return LOAD_PROFILES[profile][model]
+    except KeyError:
+        raise ValueError(f"Unknown loading profile {profile!r} for {model.__name__}")
@@ -0,0 +1,151 @@
+"""
+Low-stock goods: index-backed query and an optional in-memory watcher.
+
+A goods document is low on stock when quantity <= low_stock_threshold. The
+query pairs that $expr with plain predicates matching the partial indexes in
+app/mongo_indexes.py, so only candidate rows are examined.
+
+LowStockWatcher keeps the current low-stock set in memory. It follows a change
+stream on replica sets (Atlas) and falls back to periodic refreshes on a
+standalone mongod, where change streams are unavailable.
+"""
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from pymongo.errors import OperationFailure
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_LOW_STOCK_THRESHOLD = 10  # MongoGoods.low_stock_threshold default
+
+# Goods without a low_stock_threshold are only reachable through the quantity index,
+# so it must reach at least the default threshold
+LOW_STOCK_INDEX_CEILING = max(settings.LOW_STOCK_INDEX_CEILING, DEFAULT_LOW_STOCK_THRESHOLD)
+
+# "$changeStream is only supported on replica sets"
+CHANGE_STREAMS_UNSUPPORTED = (40573,)
+
+LOW_STOCK_EXPR = {
+    "$expr": {"$lte": ["$quantity", {"$ifNull": ["$low_stock_threshold", DEFAULT_LOW_STOCK_THRESHOLD]}]}
+}
+
+def low_stock_filter(ceiling: Optional[int] = None) -> dict:
+    """
+    Goods with quantity <= low_stock_threshold.
+
+    Each $or branch implies one partial index filter: rows with quantity under the
+    ceiling, and the rare rows whose threshold is set above it.
+    """
+    ceiling = LOW_STOCK_INDEX_CEILING if ceiling is None else max(ceiling, DEFAULT_LOW_STOCK_THRESHOLD)
+    return {
+        "$or": [
+            {"quantity": {"$lte": ceiling}, **LOW_STOCK_EXPR},
+            {"low_stock_threshold": {"$gt": ceiling}, **LOW_STOCK_EXPR},
+        ]
+    }
+
+def is_low_stock(document: dict) -> bool:
+    threshold = document.get("low_stock_threshold")
+    if threshold is None:
+        threshold = DEFAULT_LOW_STOCK_THRESHOLD
+    return document.get("quantity", 0) <= threshold
+
+class LowStockWatcher:
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self.mode = "change_stream"
+        self.last_refresh: Optional[float] = None
+        self.events = 0
+        self.errors = 0
+        self._items = {}
+        self._task: Optional[asyncio.Task] = None
+        self._collection = None
+
+    @property
+    def ready(self) -> bool:
+        return self.last_refresh is not None and self._task is not None and not self._task.done()
+
+    def start(self, collection):
+        self._collection = collection
+        self._task = asyncio.create_task(self._run(), name="low-stock-watcher")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self, category: Optional[str] = None, branch_id: Optional[int] = None, limit: int = 100) -> List[dict]:
+        """Current low-stock goods, lowest quantity first (copies, safe to mutate)"""
+        items = [
+            document for document in self._items.values()
+            if (category is None or document.get("category") == category)
+            and (branch_id is None or document.get("branch_id") == branch_id)
+        ]
+        items.sort(key=lambda document: (document.get("quantity", 0), str(document["_id"])))
+        return [dict(document) for document in items[:limit]]
+
+    async def refresh(self):
+        documents = await self._collection.find(low_stock_filter()).to_list(length=None)
+        self._items = {document["_id"]: document for document in documents}
+        self.last_refresh = time.time()
+
+    def apply_change(self, change: dict):
+        self.events += 1
+        document_id = change["documentKey"]["_id"]
+        document = change.get("fullDocument")
+        if change["operationType"] == "delete" or document is None or not is_low_stock(document):
+            self._items.pop(document_id, None)
+        else:
+            self._items[document_id] = document
+
+    async def _follow_change_stream(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        async with self._collection.watch(pipeline, full_document="updateLookup") as stream:
+            # Open the stream before the snapshot so no change falls between them
+            await stream.try_next()
+            await self.refresh()
+            logger.info(f"Low-stock watcher following change stream ({len(self._items)} items)")
+            async for change in stream:
+                self.apply_change(change)
+
+    async def _run(self):
+        while True:
+            try:
+                if self.mode == "change_stream":
+                    try:
+                        await self._follow_change_stream()
+                        continue
+                    except OperationFailure as e:
+                        if e.code not in CHANGE_STREAMS_UNSUPPORTED:
+                            raise
+                        self.mode = "polling"
+                        logger.info(f"Change streams unavailable; low-stock watcher polling every {self.poll_interval}s")
+                await self.refresh()
+                await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Low-stock watcher error, retrying in {self.poll_interval}s: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "ready": self.ready,
+            "items": len(self._items),
+            "events": self.events,
+            "errors": self.errors,
+            "last_refresh": self.last_refresh,
+        }
+
+low_stock_watcher = LowStockWatcher(settings.LOW_STOCK_POLL_INTERVAL_SECONDS)
@@ -4,12 +4,21 @@ import logging
 import sys
 import os
 from contextlib import asynccontextmanager
+import anyio.to_thread
 
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import engine, Base
-from app.mongodb import connect_to_mongo, close_mongo_connection
+from app.database import engine, async_engine, Base
+from app.instrumentation import QueryMetricsMiddleware, instrument_engine
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.mongo_indexes import ensure_indexes
+from app.low_stock_watcher import low_stock_watcher
+from app.health import readiness_monitor
+from app.auth_handler import password_pool
+from app.activity_buffer import activity_buffers
+from app.storage import get_storage
 from app.routers import auth, users, goods, branches, assignments, items, customer_applications
 from app.routers import mongo_users, mongo_goods, mongo_auth
 
@@ -18,13 +27,16 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 from app.config import get_settings
+from app.pagination import NEXT_CURSOR_HEADER
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from app.services.exceptions import (
     EntityNotFoundError,
     DuplicateEntityError,
     InsufficientCapacityError,
     UnauthorizedOperationError,
+    InsufficientStockError,
+    ConcurrencyConflictError,
 )
 
 settings = get_settings()
@@ -34,14 +46,36 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting up {settings.APP_NAME} v{settings.APP_VERSION} [{settings.ENVIRONMENT}]...")
+    # Worker threads for sync handlers / run_in_threadpool (per process)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_TOKENS
+    # Fail fast on a misconfigured storage backend instead of on the first upload
+    get_storage()
     # Create SQLAlchemy tables
     Base.metadata.create_all(bind=engine)
     # Connect to MongoDB
     await connect_to_mongo()
+    # Create missing MongoDB indexes (idempotent; changed ones are only reported)
+    if settings.MONGO_ENSURE_INDEXES:
+        summary = await ensure_indexes(get_database())
+        logger.info(f"MongoDB indexes reconciled: {summary}")
+    if settings.LOW_STOCK_WATCHER_ENABLED:
+        low_stock_watcher.start(get_database().goods)
+    # Start batched activity logging
+    if settings.ACTIVITY_BUFFER_ENABLED:
+        for buffer in activity_buffers:
+            buffer.start()
+    # Background dependency checks behind /readyz
+    await readiness_monitor.start()
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await readiness_monitor.stop()
+    await low_stock_watcher.stop()
+    for buffer in activity_buffers:
+        await buffer.stop()
     await close_mongo_connection()
+    await async_engine.dispose()
+    password_pool.shutdown()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -52,15 +86,9 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
-# Enterprise Security Headers Middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    return response
+# Per-request SQL/Mongo query counts and timings (Server-Timing, slow query log)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 
 # CORS middleware
 app.add_middleware(
@@ -69,7 +97,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
+app.add_middleware(QueryMetricsMiddleware)
+# Enterprise security headers + route latency histograms (pure ASGI, replaces the http middleware)
+app.add_middleware(MetricsMiddleware)
 
 # Global Domain Exception Handlers
 @app.exception_handler(EntityNotFoundError)
@@ -88,6 +120,14 @@ async def insufficient_capacity_handler(request: Request, exc: InsufficientCapac
 async def unauthorized_operation_handler(request: Request, exc: UnauthorizedOperationError):
     return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"detail": str(exc)})
 
+@app.exception_handler(InsufficientStockError)
+async def insufficient_stock_handler(request: Request, exc: InsufficientStockError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+@app.exception_handler(ConcurrencyConflictError)
+async def concurrency_conflict_handler(request: Request, exc: ConcurrencyConflictError):
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication (SQLite)"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -118,12 +158,22 @@ async def liveness_probe():
     """Kubernetes liveness probe - checks process status."""
     return {"status": "healthy", "message": "StockHub API process is alive"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/readyz")
 async def readiness_probe():
-    """Kubernetes readiness probe - checks database connectivity."""
-    return {
-        "status": "ready",
-        "database": "connected",
-        "environment": settings.ENVIRONMENT
-    }
+    """Kubernetes readiness probe - cached SQL/MongoDB health from the background monitor."""
+    snapshot = readiness_monitor.snapshot()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if snapshot["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if snapshot["ready"] else "not_ready",
+            "draining": snapshot["draining"],
+            "dependencies": snapshot["dependencies"],
+            "environment": settings.ENVIRONMENT
+        }
+    )
 
@@ -0,0 +1,202 @@
+"""
+Prometheus text-format metrics, collected without a client library.
+
+MetricsMiddleware (pure ASGI, no per-request task or Response object) times
+every HTTP request into a fixed-bucket histogram per route template, tracks
+in-flight requests and sets the security headers. Pool, executor, cache and
+buffer gauges are read from their owners only when /metrics is scraped.
+"""
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+import anyio.to_thread
+
+from app.activity_buffer import activity_buffers
+from app.auth_handler import password_pool
+from app.database import async_engine, engine
+from app.health import readiness_monitor
+from app.instrumentation import mongo_pool_listener
+from app.mongodb import mongodb
+from app.principal_cache import mongo_principals, sql_principals
+from app.stats_cache import stats_cache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"  # 404s and CORS preflights; keeps raw paths out of the labels
+
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+]
+
+class RequestStats:
+    """Request counts and latency histograms; only touched from the event loop thread"""
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        # (method, route) -> [per-bucket counts..., +Inf count], sum of seconds
+        self.histograms: Dict[Tuple[str, str], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float):
+        key = (method, route, status_code)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.histograms.get((method, route))
+        if histogram is None:
+            histogram = self.histograms[(method, route)] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = histogram
+        counts[bisect_left(self.buckets, seconds)] += 1
+        total[0] += seconds
+
+request_stats = RequestStats()
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        request_stats.in_flight += 1
+
+        async def send_with_headers(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + SECURITY_HEADERS}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            request_stats.in_flight -= 1
+            # The router stores the matched APIRoute in the scope: label by its template
+            route = scope.get("route")
+            request_stats.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                time.perf_counter() - started,
+            )
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class _Exposition:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, metric_type: str, help_text: str, samples):
+        """samples: iterable of (labels dict, value)"""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+def _request_metrics(out: _Exposition):
+    out.metric("stockhub_http_requests_in_flight", "gauge", "HTTP requests currently being served",
+               [({}, request_stats.in_flight)])
+    out.metric("stockhub_http_requests_total", "counter", "HTTP requests by route template and status",
+               [({"method": method, "route": route, "status": code}, count)
+                for (method, route, code), count in sorted(request_stats.requests.items())])
+
+    name = "stockhub_http_request_duration_seconds"
+    out.lines.append(f"# HELP {name} HTTP request latency by route template")
+    out.lines.append(f"# TYPE {name} histogram")
+    for (method, route), (counts, total) in sorted(request_stats.histograms.items()):
+        cumulative = 0
+        for bound, count in zip(request_stats.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            out.lines.append(f"{name}_bucket{_labels(method=method, route=route, le=le)} {cumulative}")
+        out.lines.append(f"{name}_sum{_labels(method=method, route=route)} {total[0]}")
+        out.lines.append(f"{name}_count{_labels(method=method, route=route)} {cumulative}")
+
+def _pool_metrics(out: _Exposition):
+    sql_samples = []
+    for engine_name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        # SingletonThreadPool/StaticPool (in-memory SQLite) have no sizing
+        if not hasattr(pool, "checkedout"):
+            continue
+        sql_samples += [
+            ({"engine": engine_name, "state": "size"}, pool.size()),
+            ({"engine": engine_name, "state": "checked_out"}, pool.checkedout()),
+            ({"engine": engine_name, "state": "idle"}, pool.checkedin()),
+            ({"engine": engine_name, "state": "overflow"}, pool.overflow()),
+        ]
+    out.metric("stockhub_sql_pool_connections", "gauge", "SQLAlchemy pool connections by state", sql_samples)
+
+    mongo = mongo_pool_listener.stats()
+    mongo_samples = [({"state": state}, mongo[state]) for state in ("open", "checked_out", "waiting")]
+    if mongodb.client is not None:
+        mongo_samples.append(({"state": "max"}, mongodb.client.delegate.options.pool_options.max_pool_size))
+    out.metric("stockhub_mongo_pool_connections", "gauge", "MongoDB pool connections by state", mongo_samples)
+    out.metric("stockhub_mongo_pool_checkout_failures_total", "counter", "Failed MongoDB connection checkouts",
+               [({}, mongo["checkout_failures"])])
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    out.metric("stockhub_threadpool_tokens", "gauge", "Default AnyIO thread limiter tokens (sync handlers, run_in_threadpool)", [
+        ({"state": "total"}, limiter.total_tokens),
+        ({"state": "borrowed"}, limiter.borrowed_tokens),
+    ])
+    out.metric("stockhub_threadpool_waiting", "gauge", "Tasks waiting for a worker thread",
+               [({}, limiter.statistics().tasks_waiting)])
+
+    hashing = password_pool.stats()
+    out.metric("stockhub_password_hash_workers", "gauge", "Password hashing executor by state", [
+        ({"state": "max"}, hashing["workers"]),
+        ({"state": "active"}, hashing["active"]),
+        ({"state": "queued"}, hashing["queued"]),
+    ])
+    out.metric("stockhub_password_hash_rejected_total", "counter", "Password hashing requests shed with 503",
+               [({}, hashing["rejected"])])
+
+def _cache_metrics(out: _Exposition):
+    caches = [(cache.name, cache.stats()) for cache in (sql_principals, mongo_principals)]
+    caches.append(("stats", stats_cache.stats()))
+    out.metric("stockhub_cache_hits_total", "counter", "Cache hits", [({"cache": name}, s["hits"]) for name, s in caches])
+    out.metric("stockhub_cache_misses_total", "counter", "Cache misses", [({"cache": name}, s["misses"]) for name, s in caches])
+    out.metric("stockhub_cache_hit_ratio", "gauge", "Cache hit ratio since start",
+               [({"cache": name}, round(s["hit_ratio"], 4)) for name, s in caches])
+    out.metric("stockhub_cache_entries", "gauge", "Cached entries", [({"cache": name}, s["entries"]) for name, s in caches])
+
+    buffers = [buffer.stats() for buffer in activity_buffers]
+    out.metric("stockhub_activity_buffer_pending", "gauge", "Activity events waiting to be flushed",
+               [({"buffer": s["name"]}, s["pending"]) for s in buffers])
+    out.metric("stockhub_activity_buffer_flushed_total", "counter", "Activity events written",
+               [({"buffer": s["name"]}, s["flushed"]) for s in buffers])
+    out.metric("stockhub_activity_buffer_dropped_total", "counter", "Activity events dropped (overflow or failed flush)",
+               [({"buffer": s["name"]}, s["dropped"]) for s in buffers])
+
+def _health_metrics(out: _Exposition):
+    dependencies = readiness_monitor.snapshot()["dependencies"]
+    out.metric("stockhub_dependency_up", "gauge", "1 if the dependency passed its last readiness check",
+               [({"dependency": name}, int(result["status"] != "down")) for name, result in dependencies.items()])
+    out.metric("stockhub_dependency_latency_ms", "gauge", "Latency of the last readiness check",
+               [({"dependency": name}, result["latency_ms"])
+                for name, result in dependencies.items() if result.get("latency_ms") is not None])
+
+def render_metrics() -> str:
+    """Current metrics in the Prometheus text exposition format (call from the event loop)"""
+    out = _Exposition()
+    _request_metrics(out)
+    _pool_metrics(out)
+    _cache_metrics(out)
+    _health_metrics(out)
+    return out.render()
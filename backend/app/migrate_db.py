@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from sqlalchemy import text
 from app.database import engine, SessionLocal
+from app.crud import reconcile_branch_capacity
 from datetime import datetime
 import logging
 
@@ -79,6 +80,52 @@ def run_migrations():
             logger.warning(f"Could not create indexes: {e}")
             db.rollback()
         
+        # Compound indexes backing keyset (cursor) pagination on listings
+        try:
+            db.execute(text("CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users(created_at, id);"))
+            db.execute(text("CREATE INDEX IF NOT EXISTS ix_goods_created_at_id ON goods(created_at, id);"))
+            db.execute(text("CREATE INDEX IF NOT EXISTS ix_customer_applications_created_at_id ON customer_applications(created_at, id);"))
+            db.commit()
+            logger.info("Created keyset pagination indexes")
+        except Exception as e:
+            logger.warning(f"Could not create keyset pagination indexes: {e}")
+            db.rollback()
+        
+        # Branch capacity counters: per-item volume on goods, maintained usage on branches
+        for table, column, ddl in [
+            ("goods", "unit_volume", "ALTER TABLE goods ADD COLUMN unit_volume FLOAT NOT NULL DEFAULT 1.0;"),
+            ("branches", "used_capacity", "ALTER TABLE branches ADD COLUMN used_capacity FLOAT NOT NULL DEFAULT 0;"),
+        ]:
+            try:
+                db.execute(text(ddl))
+                db.commit()
+                logger.info(f"Added {column} column to {table} table")
+            except Exception as e:
+                if "duplicate column name" in str(e).lower() or "already exists" in str(e).lower():
+                    logger.info(f"{column} column already exists in {table} table")
+                else:
+                    logger.warning(f"Could not add {column} column: {e}")
+                db.rollback()
+        
+        # available_space = capacity - used_capacity is fractional once goods have fractional
+        # unit volumes; SQLite stores REALs in the INTEGER column as-is, other databases need the type changed
+        if engine.dialect.name != "sqlite":
+            try:
+                db.execute(text("ALTER TABLE branches ALTER COLUMN available_space TYPE FLOAT;"))
+                db.commit()
+                logger.info("Changed branches.available_space to FLOAT")
+            except Exception as e:
+                logger.warning(f"Could not change available_space to FLOAT: {e}")
+                db.rollback()
+        
+        # Backfill the counters from current goods
+        try:
+            drift = reconcile_branch_capacity(db)
+            logger.info(f"Reconciled used capacity for {len(drift)} branches")
+        except Exception as e:
+            logger.warning(f"Could not reconcile branch capacity: {e}")
+            db.rollback()
+        
         logger.info("Database migration completed successfully!")
         
     except Exception as e:
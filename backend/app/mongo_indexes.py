@@ -0,0 +1,104 @@
+"""
+Declarative MongoDB index plan, reconciled at startup.
+
+INDEX_REGISTRY lists the indexes each collection must have. ensure_indexes()
+compares it with what the server reports and only creates missing indexes, so
+it is safe to run on every boot and against databases created by
+scripts/migrate_to_mongodb.py. An index whose options changed is only reported:
+rebuilding drops it first (a unique constraint is gone until the new build
+finishes), so that is left to an explicit maintenance run:
+    python scripts/ensure_mongo_indexes.py --rebuild
+"""
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.low_stock_watcher import LOW_STOCK_INDEX_CEILING
+from app.services.goods_search import TEXT_INDEX_FIELDS, TEXT_INDEX_NAME, TEXT_INDEX_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_INDEX_NAME = "goods_low_stock"
+HIGH_THRESHOLD_INDEX_NAME = "goods_high_low_stock_threshold"
+
+# Options that make two indexes with the same keys different
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "weights", "expireAfterSeconds")
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("username", ASCENDING)], unique=True),   # login, registration checks
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("role", ASCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),  # keyset listing
+    ],
+    "goods": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("category", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("branch_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("sku", ASCENDING)]),  # anchored SKU prefix search
+        IndexModel(TEXT_INDEX_FIELDS, name=TEXT_INDEX_NAME, weights=TEXT_INDEX_WEIGHTS),
+        # Only rows that can be low on stock; queries must repeat the quantity bound to use it
+        IndexModel(
+            [("quantity", ASCENDING), ("_id", ASCENDING)],
+            name=LOW_STOCK_INDEX_NAME,
+            partialFilterExpression={"quantity": {"$lte": LOW_STOCK_INDEX_CEILING}},
+        ),
+        # Companion for goods whose threshold exceeds the ceiling (see low_stock_filter)
+        IndexModel(
+            [("low_stock_threshold", ASCENDING), ("quantity", ASCENDING)],
+            name=HIGH_THRESHOLD_INDEX_NAME,
+            partialFilterExpression={"low_stock_threshold": {"$gt": LOW_STOCK_INDEX_CEILING}},
+        ),
+    ],
+    "user_activities": [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)]),  # per-user history
+        IndexModel([("timestamp", DESCENDING)]),
+    ],
+}
+
+def _options(spec: dict) -> dict:
+    return {option: spec.get(option) for option in COMPARED_OPTIONS}
+
+def _find_existing(existing: dict, document: dict):
+    """Existing index with the same name, or (for non-text indexes) the same key pattern"""
+    if document["name"] in existing:
+        return document["name"], existing[document["name"]]
+    keys = list(document["key"].items())
+    for name, info in existing.items():
+        if list(info["key"]) == keys:
+            return name, info
+    return None, None
+
+async def ensure_indexes(database, registry: Dict[str, List[IndexModel]] = None, rebuild: bool = False) -> dict:
+    """Create missing indexes (and, with `rebuild`, drop and recreate changed ones); returns counts per outcome"""
+    summary = {"created": 0, "rebuilt": 0, "mismatched": 0, "unchanged": 0, "failed": 0}
+    for collection_name, models in (registry or INDEX_REGISTRY).items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        for model in models:
+            document = model.document
+            name, info = _find_existing(existing, document)
+            try:
+                if info is None:
+                    await collection.create_indexes([model])
+                    summary["created"] += 1
+                    logger.info(f"Created index {document['name']} on {collection_name}")
+                elif _options(info) != _options(document) and not rebuild:
+                    summary["mismatched"] += 1
+                    logger.warning(f"Index {name} on {collection_name} differs from the index plan "
+                                   f"(has {_options(info)}, wants {_options(document)}); "
+                                   f"rebuild it with scripts/ensure_mongo_indexes.py --rebuild")
+                elif _options(info) != _options(document):
+                    await collection.drop_index(name)
+                    await collection.create_indexes([model])
+                    summary["rebuilt"] += 1
+                    logger.info(f"Rebuilt index {name} on {collection_name} with new options")
+                else:
+                    summary["unchanged"] += 1
+            except OperationFailure as e:
+                # e.g. duplicate usernames block a unique index; keep booting and report it
+                summary["failed"] += 1
+                logger.warning(f"Could not build index {document['name']} on {collection_name}: {e}")
+    return summary
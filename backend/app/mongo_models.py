@@ -226,3 +226,7 @@ class StockUpdate(BaseModel):
     previous_quantity: int
     new_quantity: int
     updated_at: str  # ISO datetime string from frontend
+
+class StockMovementBatch(BaseModel):
+    """Batch of stock movements applied as one bulk write; lines for the same goods are merged"""
+    movements: List[StockUpdate] = Field(..., min_length=1, max_length=5000)
@@ -3,8 +3,12 @@ MongoDB configuration and database connection using Motor async driver
 """
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Optional
+import asyncio
 import logging
 
+from app.config import get_settings
+from app.instrumentation import mongo_command_listener, mongo_pool_listener
+
 logger = logging.getLogger(__name__)
 
 class MongoDB:
@@ -21,7 +25,14 @@ DATABASE_NAME = "stockhub"
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        mongodb.client = AsyncIOMotorClient(MONGODB_URL)
+        settings = get_settings()
+        mongodb.client = AsyncIOMotorClient(
+            MONGODB_URL,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,  # per worker process
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            event_listeners=[mongo_command_listener, mongo_pool_listener],
+        )
+        mongo_command_listener.bind(asyncio.get_running_loop(), mongodb.client)
         mongodb.database = mongodb.client[DATABASE_NAME]
         
         # Test the connection
@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination helpers shared by the MongoDB and SQLAlchemy listings.
+
+Listings are ordered newest first by (created_at, id). A cursor is an opaque,
+URL-safe token holding the sort key of the last row of the previous page, so the
+next page is a range seek on the matching compound index instead of an offset scan.
+Rows without a created_at have no place in that order and are left out of keyset
+listings; offset listings are unordered, so they never hand out a cursor.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, last_id) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(last_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor into (created_at, id); raises 400 on tampered or stale tokens"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(payload["c"]), payload["i"]
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def mongo_keyset_filter(cursor: Optional[str]) -> dict:
+    """Mongo filter selecting documents after the cursor in (created_at desc, _id desc) order"""
+    if not cursor:
+        return {}
+    created_at, last_id = decode_cursor(cursor)
+    if not ObjectId.is_valid(last_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    last_id = ObjectId(last_id)
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]
+    }
+
+MONGO_KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+def apply_sql_keyset(query, model, cursor: Optional[str]):
+    """Order a SQLAlchemy query by (created_at desc, id desc) and seek past the cursor"""
+    query = query.filter(model.created_at.isnot(None))
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        try:
+            last_id = int(last_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        query = query.filter(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < last_id),
+            )
+        )
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+def next_cursor_for(rows: Sequence, limit: int, cursor: Optional[str]) -> Optional[str]:
+    """
+    Cursor for the page after `rows` (ORM objects), or None when the listing is
+    exhausted or was not a keyset listing (`cursor` is None)
+    """
+    if cursor is None or limit <= 0 or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if last.created_at is None:
+        return None
+    return encode_cursor(last.created_at, last.id)
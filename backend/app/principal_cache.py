@@ -0,0 +1,123 @@
+"""
+In-process cache of authenticated principals keyed by JWT token id.
+
+Resolving the caller of an authenticated request used to cost one database
+lookup per request. Entries live for at most PRINCIPAL_CACHE_TTL_SECONDS and
+never outlive the token that produced them; user mutations invalidate them.
+
+Concurrent requests must not share one mutable principal, so the cache keeps an
+immutable snapshot of each principal and hands every hit its own fresh copy.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import get_settings
+
+settings = get_settings()
+
+def token_cache_key(token: str, payload: dict) -> str:
+    """Cache key for a decoded token: its `jti`, or a digest for tokens issued without one"""
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+def snapshot_orm(instance):
+    """Read-only copy of an ORM instance's column values"""
+    mapper = inspect(instance).mapper
+    return mapper.class_, MappingProxyType({attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+
+def restore_orm(snapshot):
+    """Fresh detached instance built from snapshot_orm(); relationships stay unloaded"""
+    cls, values = snapshot
+    instance = cls(**values)
+    make_transient_to_detached(instance)
+    return instance
+
+class PrincipalCache:
+    def __init__(self, name: str, ttl_seconds: int, max_entries: int,
+                 snapshot: Callable[[Any], Any] = copy.deepcopy, restore: Callable[[Any], Any] = copy.deepcopy):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._snapshot = snapshot
+        self._restore = restore
+        self._entries = OrderedDict()  # key -> (expires_at, username, snapshot)
+        self._keys_by_username = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, username, snapshot = entry
+            if expires_at <= time.time():
+                self._remove(key, username)
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self._restore(snapshot)
+
+    def set(self, key: str, username: str, principal: Any, token_expires_at: Optional[float] = None):
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, float(token_expires_at))
+        snapshot = self._snapshot(principal)
+        with self._lock:
+            self._entries[key] = (expires_at, username, snapshot)
+            self._entries.move_to_end(key)
+            self._keys_by_username.setdefault(username, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key, (_, oldest_username, _) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_username)
+
+    def invalidate_user(self, username: Optional[str]):
+        """Drop every cached principal for a user (after update, deactivation or delete)"""
+        if not username:
+            return
+        with self._lock:
+            for key in self._keys_by_username.pop(username, set()):
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_username.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def _remove(self, key: str, username: str):
+        self._entries.pop(key, None)
+        keys = self._keys_by_username.get(username)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_username[username]
+
+# SQLAlchemy users (column snapshots, restored as detached instances) and MongoDB user documents (deep copies)
+sql_principals = PrincipalCache("sql_principals", settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+                                snapshot=snapshot_orm, restore=restore_orm)
+mongo_principals = PrincipalCache("mongo_principals", settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES)
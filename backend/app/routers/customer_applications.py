@@ -1,34 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import cloudinary
-import cloudinary.uploader
+import asyncio
+import logging
 from datetime import datetime
 import os
 from pydantic import ValidationError
 import json
 
-from app.database import get_db, CustomerApplication, User
+from app.database import get_async_db, CustomerApplication, User
 from app.schemas import CustomerApplicationCreate, CustomerApplication as CustomerApplicationSchema, CustomerApplicationUpdate
 from app.auth_handler import decode_jwt
-from app import crud
+from app.auth_dependencies import lookup_principal_async
+from app.pagination import NEXT_CURSOR_HEADER, apply_sql_keyset, next_cursor_for
+from app.storage import StorageBackend, get_storage
+from app.stats_cache import APPLICATION_STATS, stats_cache
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name="dbqrx0n5g",
-    api_key="712284262316659",
-    api_secret="Rp9zfZdb9SslANyrSP2F4HB2jDk"
-)
+INVENTORY_FOLDER = "stockhub/applications/inventory"
+DOCUMENTS_FOLDER = "stockhub/applications/documents"
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
     """Get current user from JWT token"""
     payload = decode_jwt(credentials.credentials)
-    username = payload.get("sub")
-    user = crud.get_user_by_username(db, username=username)
+    user = await lookup_principal_async(credentials.credentials, payload, db)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,13 +37,25 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
     return user
 
+async def _delete_uploads(storage: StorageBackend, urls: List[Optional[str]]):
+    """Best-effort removal of (inventory list, identification doc) uploads of a failed submission"""
+    results = await asyncio.gather(
+        storage.delete_async(INVENTORY_FOLDER, urls[0]),
+        storage.delete_async(DOCUMENTS_FOLDER, urls[1]),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Could not delete orphaned upload: {result}")
+
 @router.post("/submit", response_model=CustomerApplicationSchema)
 async def submit_application(
     # Form data fields
     application_data: str = Form(...),
     inventory_list: Optional[UploadFile] = File(None),
     identification_doc: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageBackend = Depends(get_storage)
 ):
     """
     Submit a customer application with optional file uploads
@@ -57,33 +70,18 @@ async def submit_application(
     except (json.JSONDecodeError, ValidationError) as e:
         raise HTTPException(status_code=400, detail=f"Invalid application data: {str(e)}")
     
-    # Handle file uploads to Cloudinary
-    inventory_list_url = None
-    identification_doc_url = None
-    
-    try:
-        if inventory_list and inventory_list.filename:
-            # Upload inventory list to Cloudinary
-            inventory_result = cloudinary.uploader.upload(
-                inventory_list.file,
-                folder="stockhub/applications/inventory",
-                resource_type="auto",
-                public_id=f"inventory_{datetime.utcnow().timestamp()}"
-            )
-            inventory_list_url = inventory_result["secure_url"]
-        
-        if identification_doc and identification_doc.filename:
-            # Upload identification document to Cloudinary
-            id_result = cloudinary.uploader.upload(
-                identification_doc.file,
-                folder="stockhub/applications/documents",
-                resource_type="auto",
-                public_id=f"id_doc_{datetime.utcnow().timestamp()}"
-            )
-            identification_doc_url = id_result["secure_url"]
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
+    # Upload both files concurrently in the threadpool
+    uploads = await asyncio.gather(
+        storage.upload_async(inventory_list, INVENTORY_FOLDER, "inventory"),
+        storage.upload_async(identification_doc, DOCUMENTS_FOLDER, "id_doc"),
+        return_exceptions=True,
+    )
+    errors = [result for result in uploads if isinstance(result, Exception)]
+    if errors:
+        # Don't orphan the file that did upload
+        await _delete_uploads(storage, [None if isinstance(result, Exception) else result for result in uploads])
+        raise HTTPException(status_code=500, detail=f"File upload failed: {str(errors[0])}")
+    inventory_list_url, identification_doc_url = uploads
     
     # Create database entry
     try:
@@ -118,22 +116,26 @@ async def submit_application(
         )
         
         db.add(db_application)
-        db.commit()
-        db.refresh(db_application)
+        await db.commit()
+        await db.refresh(db_application)
+        stats_cache.invalidate(APPLICATION_STATS)
         
         return db_application
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        await _delete_uploads(storage, [inventory_list_url, identification_doc_url])
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @router.get("/", response_model=List[CustomerApplicationSchema])
 async def get_all_applications(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all customer applications (Employee access only)
@@ -142,19 +144,28 @@ async def get_all_applications(
     if current_user.role not in ["employee", "admin"]:
         raise HTTPException(status_code=403, detail="Access denied. Employee role required.")
     
-    query = db.query(CustomerApplication)
+    query = select(CustomerApplication)
     
     if status:
         query = query.filter(CustomerApplication.status == status)
     
-    applications = query.offset(skip).limit(limit).all()
+    if cursor is not None:
+        # Keyset mode: seek on (created_at, id) instead of scanning `skip` rows
+        query = apply_sql_keyset(query, CustomerApplication, cursor).limit(limit)
+    else:
+        query = query.offset(skip).limit(limit)
+    applications = (await db.execute(query)).scalars().all()
+    
+    next_cursor = next_cursor_for(applications, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return applications
 
 @router.get("/{application_id}", response_model=CustomerApplicationSchema)
 async def get_application(
     application_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific customer application by ID
@@ -163,7 +174,7 @@ async def get_application(
     if current_user.role not in ["employee", "admin"]:
         raise HTTPException(status_code=403, detail="Access denied. Employee role required.")
     
-    application = db.query(CustomerApplication).filter(CustomerApplication.id == application_id).first()
+    application = await db.get(CustomerApplication, application_id)
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -175,7 +186,7 @@ async def update_application(
     application_id: int,
     application_update: CustomerApplicationUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update application status and add employee notes
@@ -184,7 +195,7 @@ async def update_application(
     if current_user.role not in ["employee", "admin"]:
         raise HTTPException(status_code=403, detail="Access denied. Employee role required.")
     
-    application = db.query(CustomerApplication).filter(CustomerApplication.id == application_id).first()
+    application = await db.get(CustomerApplication, application_id)
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -203,18 +214,20 @@ async def update_application(
     application.updated_at = datetime.utcnow()
     
     try:
-        db.commit()
-        db.refresh(application)
+        await db.commit()
+        await db.refresh(application)
+        stats_cache.invalidate(APPLICATION_STATS)
         return application
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
 
 @router.delete("/{application_id}")
 async def delete_application(
     application_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageBackend = Depends(get_storage)
 ):
     """
     Delete a customer application (Admin only)
@@ -222,35 +235,32 @@ async def delete_application(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied. Admin role required.")
     
-    application = db.query(CustomerApplication).filter(CustomerApplication.id == application_id).first()
+    application = await db.get(CustomerApplication, application_id)
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
     try:
-        # Delete files from Cloudinary if they exist
-        if application.inventory_list_url:
-            # Extract public_id from URL and delete
-            public_id = application.inventory_list_url.split("/")[-1].split(".")[0]
-            cloudinary.uploader.destroy(f"stockhub/applications/inventory/{public_id}")
-        
-        if application.identification_doc_url:
-            public_id = application.identification_doc_url.split("/")[-1].split(".")[0]
-            cloudinary.uploader.destroy(f"stockhub/applications/documents/{public_id}")
+        # Delete stored files if they exist
+        await asyncio.gather(
+            storage.delete_async(INVENTORY_FOLDER, application.inventory_list_url),
+            storage.delete_async(DOCUMENTS_FOLDER, application.identification_doc_url),
+        )
         
-        db.delete(application)
-        db.commit()
+        await db.delete(application)
+        await db.commit()
+        stats_cache.invalidate(APPLICATION_STATS)
         
         return {"message": "Application deleted successfully"}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
 
 @router.get("/stats/summary")
 async def get_application_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get application statistics for dashboard
@@ -258,17 +268,20 @@ async def get_application_stats(
     if current_user.role not in ["employee", "admin"]:
         raise HTTPException(status_code=403, detail="Access denied. Employee role required.")
     
-    total_applications = db.query(CustomerApplication).count()
-    pending_applications = db.query(CustomerApplication).filter(CustomerApplication.status == "pending").count()
-    approved_applications = db.query(CustomerApplication).filter(CustomerApplication.status == "approved").count()
-    rejected_applications = db.query(CustomerApplication).filter(CustomerApplication.status == "rejected").count()
-    under_review_applications = db.query(CustomerApplication).filter(CustomerApplication.status == "under_review").count()
+    async def load_stats():
+        # One GROUP BY over status instead of a COUNT per status
+        status_counts = dict((await db.execute(
+            select(CustomerApplication.status, func.count(CustomerApplication.id)).group_by(CustomerApplication.status)
+        )).all())
+        total_applications = sum(status_counts.values())
+        approved_applications = status_counts.get("approved", 0)
+        return {
+            "total_applications": total_applications,
+            "pending_applications": status_counts.get("pending", 0),
+            "approved_applications": approved_applications,
+            "rejected_applications": status_counts.get("rejected", 0),
+            "under_review_applications": status_counts.get("under_review", 0),
+            "approval_rate": (approved_applications / total_applications * 100) if total_applications > 0 else 0
+        }
     
-    return {
-        "total_applications": total_applications,
-        "pending_applications": pending_applications,
-        "approved_applications": approved_applications,
-        "rejected_applications": rejected_applications,
-        "under_review_applications": under_review_applications,
-        "approval_rate": (approved_applications / total_applications * 100) if total_applications > 0 else 0
-    }
+    return await stats_cache.get_or_load_async(APPLICATION_STATS, load_stats)
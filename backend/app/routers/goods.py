@@ -1,62 +1,69 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app import schemas
-from app.database import get_db
-from app.auth_dependencies import get_current_user, require_employee_or_admin
-from app.services.goods_service import GoodsService
+from app.database import get_async_db
+from app.auth_dependencies import get_current_user_async, require_employee_or_admin_async
+from app.services.goods_service import AsyncGoodsService
+from app.pagination import NEXT_CURSOR_HEADER, next_cursor_for
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Goods])
-def read_goods(
+async def read_goods(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all goods with optional filtering"""
-    service = GoodsService(db)
-    return service.list_goods(skip=skip, limit=limit)
+    """Get all goods with optional filtering (offset or keyset pagination)"""
+    service = AsyncGoodsService(db)
+    goods = await service.list_goods(skip=skip, limit=limit, category=category, search=search, cursor=cursor)
+    next_cursor = next_cursor_for(goods, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return goods
 
 @router.get("/my-goods", response_model=List[schemas.Goods])
-def read_my_goods(
+async def read_my_goods(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """Get current user's goods"""
-    service = GoodsService(db)
-    return service.list_goods(skip=skip, limit=limit, owner_id=current_user.id)
+    service = AsyncGoodsService(db)
+    return await service.list_goods(skip=skip, limit=limit, owner_id=current_user.id)
 
 @router.get("/{good_id}", response_model=schemas.Goods)
-def read_good(
+async def read_good(
     good_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get good by ID"""
-    service = GoodsService(db)
-    return service.get_goods_item(good_id)
+    service = AsyncGoodsService(db)
+    return await service.get_goods_item(good_id)
 
 @router.post("/", response_model=schemas.Goods)
-def create_good(
+async def create_good(
     good: schemas.GoodsCreate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """Create new good via GoodsService"""
-    service = GoodsService(db)
-    return service.create_goods(goods_data=good, owner_id=current_user.id)
+    service = AsyncGoodsService(db)
+    return await service.create_goods(goods_data=good, owner_id=current_user.id)
 
 @router.delete("/{good_id}")
-def delete_good(
+async def delete_good(
     good_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(require_employee_or_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_employee_or_admin_async)
 ):
     """Delete good by ID via GoodsService"""
-    service = GoodsService(db)
-    service.delete_goods(good_id)
+    service = AsyncGoodsService(db)
+    await service.delete_goods(good_id)
     return {"message": "Good deleted successfully"}
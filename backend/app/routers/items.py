@@ -1,15 +1,20 @@
 """
 Items router for CRUD operations with MongoDB
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Query, status, Depends
 from typing import List
 from bson import ObjectId
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 
 from app.mongodb import get_database
 from app.models import Item, ItemCreate, ItemUpdate
+from app.serialization import DocumentProjection, MongoJSONResponse
+from app.streaming import export_fields, export_response, validate_export_format
 
-router = APIRouter()
+router = APIRouter(default_response_class=MongoJSONResponse)
+
+ITEM_PROJECTION = DocumentProjection(Item)
 
 def get_items_collection():
     """Get the items collection from database"""
@@ -25,18 +30,10 @@ async def create_item(item_data: ItemCreate):
     item_dict = item_data.dict()
     
     try:
-        result = await collection.insert_one(item_dict)
-        created_item = await collection.find_one({"_id": result.inserted_id})
-        
-        if created_item:
-            # Convert ObjectId to string for JSON serialization
-            created_item["_id"] = str(created_item["_id"])
-            return Item(**created_item)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create item"
-            )
+        # insert_one sets item_dict["_id"]; no need to read the document back
+        await collection.insert_one(item_dict)
+        created_item = ITEM_PROJECTION.select(item_dict)
+        return MongoJSONResponse(ITEM_PROJECTION.apply(created_item), status_code=status.HTTP_201_CREATED)
     except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,21 +51,26 @@ async def get_all_items():
     collection = get_items_collection()
     
     try:
-        cursor = collection.find({})
+        cursor = collection.find({}, ITEM_PROJECTION.projection)
         items = []
         
         async for document in cursor:
-            # Convert ObjectId to string for JSON serialization
-            document["_id"] = str(document["_id"])
-            items.append(Item(**document))
+            items.append(ITEM_PROJECTION.apply(document))
         
-        return items
+        return MongoJSONResponse(items)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching items: {str(e)}"
         )
 
+@router.get("/export")
+async def export_items(export_format: str = Query("csv", alias="format", description="csv | ndjson")):
+    """Stream all items as CSV or NDJSON"""
+    validate_export_format(export_format)
+    cursor = get_items_collection().find({}, ITEM_PROJECTION.projection).sort("_id", 1)
+    return export_response(cursor, export_format, export_fields(Item), "items_export")
+
 @router.get("/{item_id}", response_model=Item)
 async def get_item_by_id(item_id: str):
     """Get an item by ID"""
@@ -81,12 +83,10 @@ async def get_item_by_id(item_id: str):
     collection = get_items_collection()
     
     try:
-        item = await collection.find_one({"_id": ObjectId(item_id)})
+        item = await collection.find_one({"_id": ObjectId(item_id)}, ITEM_PROJECTION.projection)
         
         if item:
-            # Convert ObjectId to string for JSON serialization
-            item["_id"] = str(item["_id"])
-            return Item(**item)
+            return MongoJSONResponse(ITEM_PROJECTION.apply(item))
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -121,30 +121,20 @@ async def update_item(item_id: str, item_update: ItemUpdate):
         )
     
     try:
-        # Check if item exists
-        existing_item = await collection.find_one({"_id": ObjectId(item_id)})
-        if not existing_item:
+        # One round trip: update and return the new document (None if it doesn't exist)
+        updated_item = await collection.find_one_and_update(
+            {"_id": ObjectId(item_id)},
+            {"$set": update_data},
+            projection=ITEM_PROJECTION.projection,
+            return_document=ReturnDocument.AFTER
+        )
+        if not updated_item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Item not found"
             )
         
-        # Update the item
-        result = await collection.update_one(
-            {"_id": ObjectId(item_id)},
-            {"$set": update_data}
-        )
-        
-        if result.modified_count == 1:
-            updated_item = await collection.find_one({"_id": ObjectId(item_id)})
-            # Convert ObjectId to string for JSON serialization
-            updated_item["_id"] = str(updated_item["_id"])
-            return Item(**updated_item)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update item"
-            )
+        return MongoJSONResponse(ITEM_PROJECTION.apply(updated_item))
     except HTTPException:
         raise
     except Exception as e:
@@ -2,7 +2,7 @@
 MongoDB Authentication router - handles user registration and login with MongoDB Atlas
 Replaces SQLite-based authentication with MongoDB operations
 """
-from fastapi import APIRouter, HTTPException, status, Request, Depends
+from fastapi import APIRouter, HTTPException, status, Request, Response, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 from typing import Optional, List
@@ -14,10 +14,13 @@ from app.mongo_models import MongoUser, UserCreate, UserLogin, UserResponse, Use
 from app.auth_handler import (
     create_access_token, 
     decode_jwt, 
-    get_password_hash, 
-    verify_password, 
+    get_password_hash_async,
+    verify_password_async,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from app.pagination import MONGO_KEYSET_SORT, NEXT_CURSOR_HEADER, encode_cursor, mongo_keyset_filter
+from app.principal_cache import mongo_principals, token_cache_key
+from app.activity_buffer import mongo_activities
 
 router = APIRouter()
 security = HTTPBearer()
@@ -45,12 +48,23 @@ async def get_user_by_id(user_id: str):
     except:
         return None
 
+async def lookup_principal(token: str, payload: dict):
+    """Resolve the user behind a decoded token, served from the principal cache when possible"""
+    username = payload.get("sub")
+    key = token_cache_key(token, payload)
+    user = mongo_principals.get(key)
+    if user is None:
+        user = await get_user_by_username(username)
+        if user is not None:
+            mongo_principals.set(key, username, user, payload.get("exp"))
+    return user
+
 async def authenticate_user(username: str, password: str):
     """Authenticate user credentials against MongoDB"""
     user = await get_user_by_username(username)
     if not user:
         return False
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password_async(password, user["hashed_password"]):
         return False
     return user
 
@@ -69,6 +83,9 @@ async def log_user_activity(user_id: str, action: str, description: str, categor
         "timestamp": datetime.utcnow()
     }
     
+    if mongo_activities.running:
+        mongo_activities.submit(activity_data)
+        return
     await activity_collection.insert_one(activity_data)
 
 async def get_current_user_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -89,8 +106,8 @@ async def get_current_user_from_token(credentials: HTTPAuthorizationCredentials
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from MongoDB
-    user = await get_user_by_username(username)
+    # Get user from MongoDB (or the principal cache)
+    user = await lookup_principal(credentials.credentials, payload)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -130,7 +147,7 @@ async def register_user(user_data: UserCreate, request: Request):
         )
     
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
     # Create user document
     user_doc = {
@@ -206,7 +223,7 @@ async def admin_create_user(
         )
     
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
     # Create user document
     user_doc = {
@@ -326,8 +343,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from MongoDB
-    user = await get_user_by_username(username)
+    # Get user from MongoDB (or the principal cache)
+    user = await lookup_principal(credentials.credentials, payload)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -354,8 +371,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
 @router.get("/admin/users", response_model=List[UserResponse])
 async def get_all_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user = Depends(require_admin)
 ):
     """Get all users from MongoDB (admin only) - sorted by creation time descending"""
@@ -363,8 +382,15 @@ async def get_all_users(
     
     try:
         # Fetch users sorted by created_at in descending order (newest first)
-        cursor = collection.find().sort("created_at", -1).skip(skip).limit(limit)
-        users = await cursor.to_list(length=limit)
+        if cursor is not None:
+            # Keyset mode: seek past the last (created_at, _id) of the previous page
+            documents = collection.find(mongo_keyset_filter(cursor)).sort(MONGO_KEYSET_SORT).limit(limit)
+        else:
+            documents = collection.find().sort(MONGO_KEYSET_SORT).skip(skip).limit(limit)
+        users = await documents.to_list(length=limit)
+        
+        if users and len(users) == limit and users[-1].get("created_at") is not None:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(users[-1]["created_at"], users[-1]["_id"])
         
         # Convert users to UserResponse format
         user_list = []
@@ -386,6 +412,8 @@ async def get_all_users(
         
         return user_list
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -482,6 +510,7 @@ async def update_user(
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        mongo_principals.invalidate_user(existing_user["username"])
         
         # Log admin update activity
         await log_user_activity(
@@ -554,6 +583,7 @@ async def toggle_user_active_status(
                 "updated_at": datetime.utcnow()
             }}
         )
+        mongo_principals.invalidate_user(existing_user["username"])
         
         # Log admin activity
         action = "User Activated" if new_status else "User Deactivated"
@@ -610,6 +640,7 @@ async def delete_user(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
+        mongo_principals.invalidate_user(existing_user["username"])
         
         # Log admin delete activity
         await log_user_activity(
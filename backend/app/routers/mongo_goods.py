@@ -1,15 +1,50 @@
 """
 MongoDB CRUD router for Goods collection (replaces SQLite goods)
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
 from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import orjson
+import logging
 
 from app.mongodb import get_database
-from app.mongo_models import MongoGoods, GoodsCreate, GoodsUpdate, StockUpdate
+from app.mongo_models import MongoGoods, GoodsCreate, GoodsUpdate, StockUpdate, StockMovementBatch
+from app.services.exceptions import EntityNotFoundError, InsufficientStockError
+from app.services.stock_movement_service import StockMovementService, MOVEMENT_TYPES
+from app.pagination import MONGO_KEYSET_SORT, encode_cursor, mongo_keyset_filter
+from app.services.goods_search import (
+    SEARCH_MODES,
+    TEXT_INDEX_MISSING,
+    combine_filters,
+    legacy_regex_filter,
+    search_plans,
+)
+from app.config import get_settings
+from app.serialization import MongoJSONResponse, bson_utcnow, with_string_id
+from app.low_stock_watcher import low_stock_filter, low_stock_watcher
+from app.streaming import export_fields, export_response, validate_export_format
+from app.services.goods_import import (
+    IMPORT_FORMATS,
+    format_from_filename,
+    import_goods_rows,
+    iter_csv_rows,
+    iter_json_rows,
+    iter_ndjson_rows,
+)
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+router = APIRouter(default_response_class=MongoJSONResponse)
+
+TOTAL_MODES = ("exact", "estimated", "none")
+
+GOODS_EXPORT_FIELDS = export_fields(MongoGoods)
 
 def get_goods_collection():
     """Get the goods collection from database"""
@@ -23,87 +58,276 @@ async def create_goods(goods_data: GoodsCreate):
     
     # Convert to dict and add timestamps
     goods_dict = goods_data.dict()
-    goods_dict["created_at"] = datetime.utcnow()
-    goods_dict["updated_at"] = datetime.utcnow()
+    now = bson_utcnow()  # the stored precision, so the response matches a later read
+    goods_dict["created_at"] = now
+    goods_dict["updated_at"] = now
     goods_dict["sqlite_id"] = -1  # New goods get -1 to distinguish from migrated ones
     
     try:
-        result = await collection.insert_one(goods_dict)
-        created_goods = await collection.find_one({"_id": result.inserted_id})
-        
-        if created_goods:
-            # Convert ObjectId to string for JSON serialization
-            created_goods["id"] = str(created_goods["_id"])
-            del created_goods["_id"]
-            # Convert any other ObjectId fields to strings
-            for key, value in created_goods.items():
-                if isinstance(value, ObjectId):
-                    created_goods[key] = str(value)
-            return created_goods
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create goods"
-            )
+        # insert_one sets goods_dict["_id"]; no need to read the document back
+        await collection.insert_one(goods_dict)
+        return MongoJSONResponse(with_string_id(goods_dict), status_code=status.HTTP_201_CREATED)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while creating goods: {str(e)}"
         )
 
+async def _search_goods(collection, search: str, search_mode: str, category_filter: dict, page: int, limit: int):
+    """Run an index-backed search: SKU prefix fast path and/or weighted text search"""
+    max_results = settings.GOODS_SEARCH_MAX_RESULTS
+    
+    for plan_name, search_filter, sort in search_plans(search, search_mode):
+        query_filter = combine_filters(search_filter, category_filter)
+        try:
+            total = await collection.count_documents(query_filter, limit=max_results)
+        except OperationFailure as e:
+            if plan_name != "text" or e.code != TEXT_INDEX_MISSING:
+                raise
+            logger.warning("Goods text index is missing; falling back to regex search")
+            query_filter = combine_filters(legacy_regex_filter(search), category_filter)
+            sort = MONGO_KEYSET_SORT
+            total = await collection.count_documents(query_filter, limit=max_results)
+        if total:
+            break
+    
+    # Results are relevance ranked and capped at GOODS_SEARCH_MAX_RESULTS
+    skip = (page - 1) * limit
+    page_limit = min(limit, max_results - skip)
+    goods_list = []
+    if page_limit > 0:
+        documents = collection.find(query_filter).sort(sort).skip(skip).limit(page_limit)
+        async for document in documents:
+            goods_list.append(with_string_id(document))
+    
+    return MongoJSONResponse({
+        "goods": goods_list,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total + limit - 1) // limit,
+        "next_cursor": None
+    })
+
+async def _fetch_goods_page(collection, query_filter: dict, page_filter: dict, skip: int, limit: int, total_mode: str):
+    """
+    Fetch one listing page and its total according to `total_mode`.
+    
+    The page is always an index-backed find on (created_at, _id). `exact` counts
+    the filter with count_documents, `estimated` reads collection metadata for
+    unfiltered listings, and `none` skips counting; counts run alongside the page.
+    """
+    page = collection.find(page_filter).sort(MONGO_KEYSET_SORT).skip(skip).limit(limit).to_list(length=limit)
+    if total_mode == "none":
+        return await page, None
+    
+    if total_mode == "estimated" and not query_filter:
+        count = collection.estimated_document_count()
+    else:
+        # Exact, or estimated with filters (metadata can't count a filter)
+        count = collection.count_documents(query_filter)
+    documents, total = await asyncio.gather(page, count)
+    return documents, total
+
 @router.get("/")
-async def get_all_goods(page: int = 1, limit: int = 10, search: str = None, category: str = None):
-    """Get all goods with pagination and search"""
+async def get_all_goods(
+    page: int = 1,
+    limit: int = 10,
+    search: str = None,
+    category: str = None,
+    cursor: Optional[str] = None,
+    search_mode: str = "auto",
+    total_mode: str = Query("exact", alias="total", description="exact | estimated | none")
+):
+    """
+    Get all goods with pagination and search (pass `cursor` for keyset pagination).
+    
+    `search_mode` is `auto` (SKU prefix for single SKU-like tokens, else text search),
+    `text` (weighted text index, relevance sorted) or `sku` (exact SKU prefix).
+    """
+    if search and search_mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid search mode. Must be one of: {', '.join(SEARCH_MODES)}"
+        )
+    if search and cursor is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported for search results"
+        )
+    if total_mode not in TOTAL_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid total mode. Must be one of: {', '.join(TOTAL_MODES)}"
+        )
+    
     collection = get_goods_collection()
     
     try:
-        # Calculate skip value from page
-        skip = (page - 1) * limit
-        
         # Build query filter
         query_filter = {}
-        if search:
-            query_filter["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}},
-                {"sku": {"$regex": search, "$options": "i"}},
-                {"supplier": {"$regex": search, "$options": "i"}}
-            ]
         if category:
             query_filter["category"] = category
         
-        # Get total count for pagination
-        total = await collection.count_documents(query_filter)
+        if search:
+            return await _search_goods(collection, search, search_mode, query_filter, page, limit)
         
-        # Get goods with pagination
-        cursor = collection.find(query_filter).skip(skip).limit(limit).sort("created_at", -1)
-        goods_list = []
+        if cursor is not None:
+            # Keyset mode: seek past the last (created_at, _id) of the previous page
+            page_filter = combine_filters(query_filter, mongo_keyset_filter(cursor))
+            skip = 0
+        else:
+            page_filter = query_filter
+            # Calculate skip value from page
+            skip = (page - 1) * limit
         
-        async for document in cursor:
-            # Convert _id to id and create response dict
-            goods_dict = dict(document)
-            goods_dict["id"] = str(goods_dict["_id"])
-            # Remove the ObjectId field completely and replace with string id
-            del goods_dict["_id"]
-            # Convert any other ObjectId fields to strings
-            for key, value in goods_dict.items():
-                if isinstance(value, ObjectId):
-                    goods_dict[key] = str(value)
-            goods_list.append(goods_dict)
+        documents, total = await _fetch_goods_page(collection, query_filter, page_filter, skip, limit, total_mode)
+        next_cursor = None
+        if documents and len(documents) == limit and documents[-1].get("created_at") is not None:
+            next_cursor = encode_cursor(documents[-1]["created_at"], documents[-1]["_id"])
         
-        return {
-            "goods": goods_list,
+        return MongoJSONResponse({
+            "goods": [with_string_id(document) for document in documents],
             "total": total,
             "page": page,
             "limit": limit,
-            "total_pages": (total + limit - 1) // limit
-        }
+            "total_pages": (total + limit - 1) // limit if total is not None else None,
+            "next_cursor": next_cursor
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching goods: {str(e)}"
         )
 
+@router.get("/low-stock")
+async def get_low_stock_goods(
+    category: Optional[str] = None,
+    branch_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Goods at or below their low_stock_threshold, lowest quantity first.
+    
+    Served from the in-memory watcher when it is running, otherwise by a
+    partial-index backed query (never a collection scan).
+    """
+    if low_stock_watcher.ready:
+        goods = low_stock_watcher.snapshot(category=category, branch_id=branch_id, limit=limit)
+        return MongoJSONResponse({
+            "goods": [with_string_id(document) for document in goods],
+            "total": len(goods),
+            "source": "watcher"
+        })
+    
+    collection = get_goods_collection()
+    
+    try:
+        query_filter = combine_filters(
+            low_stock_filter(),
+            {"category": category} if category else {},
+            {"branch_id": branch_id} if branch_id is not None else {},
+        )
+        documents = await collection.find(query_filter).sort([("quantity", 1), ("_id", 1)]).limit(limit).to_list(length=limit)
+        return MongoJSONResponse({
+            "goods": [with_string_id(document) for document in documents],
+            "total": len(documents),
+            "source": "query"
+        })
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching low-stock goods: {str(e)}"
+        )
+
+@router.get("/export")
+async def export_goods(
+    export_format: str = Query("csv", alias="format", description="csv | ndjson"),
+    category: Optional[str] = None,
+    branch_id: Optional[int] = None
+):
+    """Stream every matching goods document as CSV or NDJSON (constant memory)"""
+    validate_export_format(export_format)
+    query_filter = {}
+    if category:
+        query_filter["category"] = category
+    if branch_id is not None:
+        query_filter["branch_id"] = branch_id
+    cursor = get_goods_collection().find(query_filter).sort(MONGO_KEYSET_SORT)
+    return export_response(cursor, export_format, GOODS_EXPORT_FIELDS, "goods_export")
+
+async def _json_import_rows(request: Request):
+    try:
+        body = await run_in_threadpool(orjson.loads, await request.body())
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON body: {e}")
+    if isinstance(body, dict):
+        body = body.get("goods")
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="JSON body must be a list of goods or {\"goods\": [...]}"
+        )
+    return iter_json_rows(body)
+
+@router.post("/import")
+async def import_goods(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", description="csv | ndjson (defaults to the file extension)")
+):
+    """
+    Bulk import goods from a CSV / NDJSON upload (multipart field `file`) or a JSON array body.
+    
+    Rows are parsed and validated incrementally and inserted with unordered
+    insert_many in IMPORT_CHUNK_SIZE batches; invalid rows are reported, not fatal.
+    """
+    collection = get_goods_collection()
+    content_type = request.headers.get("content-type", "")
+    
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            try:
+                upload = form.get("file")
+                if upload is None or isinstance(upload, str):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing upload field 'file'")
+                file_format = import_format or format_from_filename(upload.filename)
+                if file_format not in IMPORT_FORMATS:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Invalid import format. Must be one of: {', '.join(IMPORT_FORMATS)}"
+                    )
+                rows = iter_csv_rows(upload.file) if file_format == "csv" else iter_ndjson_rows(upload.file)
+                report = await import_goods_rows(
+                    collection, rows, settings.IMPORT_CHUNK_SIZE, settings.IMPORT_MAX_REPORTED_ERRORS
+                )
+            finally:
+                await form.close()
+        elif content_type.startswith("application/json"):
+            rows = await _json_import_rows(request)
+            report = await import_goods_rows(
+                collection, rows, settings.IMPORT_CHUNK_SIZE, settings.IMPORT_MAX_REPORTED_ERRORS
+            )
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Upload a file as multipart/form-data or send a JSON array"
+            )
+    except HTTPException:
+        raise
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload must be UTF-8 encoded")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while importing goods: {str(e)}"
+        )
+    
+    logger.info(f"Goods import: {report['inserted']}/{report['received']} rows inserted in {report['duration_ms']}ms")
+    return MongoJSONResponse(report)
+
 @router.get("/{goods_id}")
 async def get_goods_by_id(goods_id: str):
     """Get goods by ID"""
@@ -120,14 +344,7 @@ async def get_goods_by_id(goods_id: str):
         
         if goods:
             # Convert _id to id for frontend compatibility
-            goods["id"] = str(goods["_id"])
-            # Remove the ObjectId field completely
-            del goods["_id"]
-            # Convert any other ObjectId fields to strings
-            for key, value in goods.items():
-                if isinstance(value, ObjectId):
-                    goods[key] = str(value)
-            return goods
+            return MongoJSONResponse(with_string_id(goods))
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -162,35 +379,20 @@ async def update_goods(goods_id: str, goods_update: GoodsUpdate):
     update_data["updated_at"] = datetime.utcnow()
     
     try:
-        # Check if goods exists
-        existing_goods = await collection.find_one({"_id": ObjectId(goods_id)})
-        if not existing_goods:
+        # One round trip: update and return the new document (None if it doesn't exist)
+        updated_goods = await collection.find_one_and_update(
+            {"_id": ObjectId(goods_id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        if not updated_goods:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Goods not found"
             )
         
-        # Update the goods
-        result = await collection.update_one(
-            {"_id": ObjectId(goods_id)},
-            {"$set": update_data}
-        )
-        
-        if result.modified_count == 1:
-            updated_goods = await collection.find_one({"_id": ObjectId(goods_id)})
-            # Convert _id to id for frontend compatibility
-            updated_goods["id"] = str(updated_goods["_id"])
-            del updated_goods["_id"]
-            # Convert any other ObjectId fields to strings
-            for key, value in updated_goods.items():
-                if isinstance(value, ObjectId):
-                    updated_goods[key] = str(value)
-            return updated_goods
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update goods"
-            )
+        # Convert _id to id for frontend compatibility
+        return MongoJSONResponse(with_string_id(updated_goods))
     except HTTPException:
         raise
     except Exception as e:
@@ -239,98 +441,81 @@ async def delete_goods(goods_id: str):
 
 @router.put("/{goods_id}/stock")
 async def update_stock(goods_id: str, stock_update: StockUpdate):
-    """Update stock quantity for goods"""
+    """Update stock quantity for goods with a single atomic round trip"""
     if not ObjectId.is_valid(goods_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid goods ID format"
         )
     
-    collection = get_goods_collection()
+    if stock_update.type not in MOVEMENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid stock update type. Must be 'inward', 'outward', or 'adjustment'"
+        )
+    
+    service = StockMovementService(get_goods_collection())
     
     try:
-        # Check if goods exists
-        existing_goods = await collection.find_one({"_id": ObjectId(goods_id)})
-        if not existing_goods:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Goods not found"
-            )
-        
-        # Validate stock operation
-        current_quantity = existing_goods.get("quantity", 0)
-        
-        # Calculate new quantity based on update type
-        if stock_update.type == "inward":
-            new_quantity = current_quantity + stock_update.quantity
-        elif stock_update.type == "outward":
-            if stock_update.quantity > current_quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Cannot dispatch {stock_update.quantity} items. Only {current_quantity} available."
-                )
-            new_quantity = current_quantity - stock_update.quantity
-        elif stock_update.type == "adjustment":
-            new_quantity = stock_update.quantity  # For adjustments, quantity is the new total
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid stock update type. Must be 'inward', 'outward', or 'adjustment'"
-            )
-        
-        # Ensure quantity doesn't go negative
-        new_quantity = max(0, new_quantity)
-        
-        # Update the goods with new quantity
-        update_data = {
-            "quantity": new_quantity,
-            "updated_at": datetime.utcnow()
-        }
-        
-        result = await collection.update_one(
-            {"_id": ObjectId(goods_id)},
-            {"$set": update_data}
+        previous_quantity, updated_goods = await service.apply_movement(
+            goods_id, stock_update.type, stock_update.quantity
         )
         
-        if result.modified_count == 1:
-            # Get updated goods
-            updated_goods = await collection.find_one({"_id": ObjectId(goods_id)})
-            updated_goods["id"] = str(updated_goods["_id"])
-            del updated_goods["_id"]
-            # Convert any other ObjectId fields to strings
-            for key, value in updated_goods.items():
-                if isinstance(value, ObjectId):
-                    updated_goods[key] = str(value)
-            
-            # Create response with stock update details
-            response = {
-                "message": f"Stock successfully updated for {updated_goods['name']}",
-                "goods": updated_goods,
-                "stock_update": {
-                    "type": stock_update.type,
-                    "quantity_changed": stock_update.quantity,
-                    "previous_quantity": current_quantity,
-                    "new_quantity": new_quantity,
-                    "reason": stock_update.reason,
-                    "updated_at": update_data["updated_at"].isoformat()
-                }
+        with_string_id(updated_goods)
+        
+        # Create response with stock update details
+        return MongoJSONResponse({
+            "message": f"Stock successfully updated for {updated_goods['name']}",
+            "goods": updated_goods,
+            "stock_update": {
+                "type": stock_update.type,
+                "quantity_changed": stock_update.quantity,
+                "previous_quantity": previous_quantity,
+                "new_quantity": updated_goods["quantity"],
+                "reason": stock_update.reason,
+                "updated_at": updated_goods["updated_at"].isoformat()
             }
-            
-            return response
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update stock"
-            )
-            
-    except HTTPException:
-        raise
+        })
+    except EntityNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Goods not found"
+        )
+    except InsufficientStockError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while updating stock: {str(e)}"
         )
 
+@router.post("/stock/batch")
+async def update_stock_batch(batch: StockMovementBatch):
+    """Apply a batch of stock movements (e.g. dock intake) with per-line results"""
+    service = StockMovementService(get_goods_collection())
+    
+    try:
+        results = await service.apply_batch(batch.movements)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while applying stock movements: {str(e)}"
+        )
+    
+    summary = {line_status: 0 for line_status in ("applied", "rejected", "not_found", "invalid", "failed")}
+    for line in results:
+        summary[line["status"]] += 1
+    
+    return {
+        "message": f"Applied {summary['applied']} of {len(results)} stock movements",
+        "total": len(results),
+        **summary,
+        "results": results
+    }
+
 @router.get("/category/{category}")
 async def get_goods_by_category(category: str):
     """Get goods by category"""
@@ -341,15 +526,9 @@ async def get_goods_by_category(category: str):
         goods = []
         
         async for document in cursor:
-            document["id"] = str(document["_id"])
-            del document["_id"]
-            # Convert any other ObjectId fields to strings
-            for key, value in document.items():
-                if isinstance(value, ObjectId):
-                    document[key] = str(value)
-            goods.append(document)
+            goods.append(with_string_id(document))
         
-        return goods
+        return MongoJSONResponse(goods)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
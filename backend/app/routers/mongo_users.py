@@ -1,16 +1,25 @@
 """
 MongoDB CRUD router for Users collection
 """
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Optional
 from bson import ObjectId
 from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 
 from app.mongodb import get_database
 from app.mongo_models import MongoUser, UserCreate
+from app.serialization import DocumentProjection, MongoJSONResponse, bson_utcnow
+from app.streaming import export_fields, export_response, validate_export_format
 
-router = APIRouter()
+router = APIRouter(default_response_class=MongoJSONResponse)
+
+USER_PROJECTION = DocumentProjection(MongoUser)
+
+# Exports never include password hashes
+USER_EXPORT_PROJECTION = DocumentProjection(MongoUser, exclude={"hashed_password"})
+USER_EXPORT_FIELDS = export_fields(MongoUser, exclude={"hashed_password"})
+ACTIVITY_EXPORT_FIELDS = ["id", "user_id", "action", "description", "category", "ip_address", "user_agent", "timestamp"]
 
 def get_users_collection():
     """Get the users collection from database"""
@@ -24,22 +33,15 @@ async def create_user(user_data: UserCreate):
     
     # Convert to dict and add timestamps
     user_dict = user_data.dict()
-    user_dict["created_at"] = datetime.utcnow()
+    user_dict["created_at"] = bson_utcnow()  # the stored precision, so the response matches a later read
     user_dict["is_active"] = True
     user_dict["sqlite_id"] = -1  # New users get -1 to distinguish from migrated ones
     
     try:
-        result = await collection.insert_one(user_dict)
-        created_user = await collection.find_one({"_id": result.inserted_id})
-        
-        if created_user:
-            created_user["_id"] = str(created_user["_id"])
-            return MongoUser(**created_user)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create user"
-            )
+        # insert_one sets user_dict["_id"]; no need to read the document back
+        await collection.insert_one(user_dict)
+        created_user = USER_PROJECTION.select(user_dict)
+        return MongoJSONResponse(USER_PROJECTION.apply(created_user), status_code=status.HTTP_201_CREATED)
     except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,20 +59,47 @@ async def get_all_users():
     collection = get_users_collection()
     
     try:
-        cursor = collection.find({})
+        cursor = collection.find({}, USER_PROJECTION.projection)
         users = []
         
         async for document in cursor:
-            document["_id"] = str(document["_id"])
-            users.append(MongoUser(**document))
+            users.append(USER_PROJECTION.apply(document))
         
-        return users
+        return MongoJSONResponse(users)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching users: {str(e)}"
         )
 
+@router.get("/export")
+async def export_users(
+    export_format: str = Query("csv", alias="format", description="csv | ndjson"),
+    role: Optional[str] = None
+):
+    """Stream all users (without password hashes) as CSV or NDJSON"""
+    validate_export_format(export_format)
+    query_filter = {"role": role} if role else {}
+    cursor = get_users_collection().find(query_filter, USER_EXPORT_PROJECTION.projection).sort("_id", 1)
+    return export_response(cursor, export_format, USER_EXPORT_FIELDS, "users_export")
+
+@router.get("/activities/export")
+async def export_user_activities(
+    export_format: str = Query("csv", alias="format", description="csv | ndjson"),
+    user_id: Optional[str] = None,
+    since: Optional[datetime] = None
+):
+    """Stream activity history, newest first, optionally for one user and/or since a timestamp"""
+    validate_export_format(export_format)
+    query_filter = {}
+    if user_id:
+        # Activities migrated from SQLite keep the integer user id; live ones store the ObjectId string
+        query_filter["user_id"] = {"$in": [user_id, int(user_id)]} if user_id.isdigit() else user_id
+    if since:
+        query_filter["timestamp"] = {"$gte": since}
+    cursor = get_database().user_activities.find(query_filter).sort("timestamp", -1)
+    return export_response(cursor, export_format, ACTIVITY_EXPORT_FIELDS, "user_activities_export")
+
 @router.get("/{user_id}", response_model=MongoUser)
 async def get_user_by_id(user_id: str):
     """Get a user by ID"""
@@ -83,11 +112,10 @@ async def get_user_by_id(user_id: str):
     collection = get_users_collection()
     
     try:
-        user = await collection.find_one({"_id": ObjectId(user_id)})
+        user = await collection.find_one({"_id": ObjectId(user_id)}, USER_PROJECTION.projection)
         
         if user:
-            user["_id"] = str(user["_id"])
-            return MongoUser(**user)
+            return MongoJSONResponse(USER_PROJECTION.apply(user))
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -105,14 +133,13 @@ async def get_users_by_role(role: str):
     collection = get_users_collection()
     
     try:
-        cursor = collection.find({"role": role})
+        cursor = collection.find({"role": role}, USER_PROJECTION.projection)
         users = []
         
         async for document in cursor:
-            document["_id"] = str(document["_id"])
-            users.append(MongoUser(**document))
+            users.append(USER_PROJECTION.apply(document))
         
-        return users
+        return MongoJSONResponse(users)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,20 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import List
-from app import crud
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import async_crud
 from app import schemas
-from app.database import get_db
+from app.database import get_async_db
 from app.auth_handler import decode_jwt
+from app.auth_dependencies import lookup_principal_async
+from app.pagination import NEXT_CURSOR_HEADER, next_cursor_for
 
 router = APIRouter()
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
     """Get current user from JWT token"""
     payload = decode_jwt(credentials.credentials)
-    username = payload.get("sub")
-    user = crud.get_user_by_username(db, username=username)
+    user = await lookup_principal_async(credentials.credentials, payload, db)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -22,7 +23,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
     return user
 
-def require_admin(current_user = Depends(get_current_user)):
+async def require_admin(current_user = Depends(get_current_user)):
     """Require admin role"""
     if current_user.role != "admin":
         raise HTTPException(
@@ -32,58 +33,63 @@ def require_admin(current_user = Depends(get_current_user)):
     return current_user
 
 @router.get("/me", response_model=schemas.User)
-def read_users_me(current_user = Depends(get_current_user)):
+async def read_users_me(current_user = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
 @router.get("/", response_model=List[schemas.User])
-def read_users(
+async def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin)
 ):
-    """Get all users (admin only)"""
-    users = crud.get_users(db, skip=skip, limit=limit)
+    """Get all users (admin only); pass `cursor` for keyset pagination"""
+    users = await async_crud.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    next_cursor = next_cursor_for(users, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin)
 ):
     """Get user by ID (admin only)"""
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await async_crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 @router.post("/", response_model=schemas.User)
-def create_user(
+async def create_user(
     user: schemas.UserCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin)
 ):
     """Create new user (admin only)"""
     # Check if user already exists
-    if crud.get_user_by_username(db, username=user.username):
+    if await async_crud.get_user_by_username(db, username=user.username):
         raise HTTPException(
             status_code=400,
             detail="Username already registered"
         )
-    if crud.get_user_by_email(db, email=user.email):
+    if await async_crud.get_user_by_email(db, email=user.email):
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
     
     # Create user
-    db_user = crud.create_user(db=db, user=user)
+    db_user = await async_crud.create_user(db=db, user=user)
     
     # Log activity
-    crud.log_user_activity(
+    await async_crud.log_user_activity(
         db=db,
         user_id=current_user.id,
         action="User Created",
@@ -96,32 +102,32 @@ def create_user(
     return db_user
 
 @router.put("/me", response_model=schemas.User)
-def update_user_me(
+async def update_user_me(
     user_update: schemas.UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Update current user profile"""
-    updated_user = crud.update_user(db, current_user.id, user_update)
+    updated_user = await async_crud.update_user(db, current_user.id, user_update)
     return updated_user
 
 @router.put("/{user_id}", response_model=schemas.User)
-def update_user(
+async def update_user(
     user_id: int,
     user_update: schemas.UserUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin)
 ):
     """Update user by ID (admin only)"""
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await async_crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    updated_user = crud.update_user(db, user_id, user_update)
+    updated_user = await async_crud.update_user(db, user_id, user_update)
     
     # Log activity
-    crud.log_user_activity(
+    await async_crud.log_user_activity(
         db=db,
         user_id=current_user.id,
         action="User Updated",
@@ -134,19 +140,19 @@ def update_user(
     return updated_user
 
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin)
 ):
     """Delete user by ID (admin only)"""
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await async_crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Log activity before deletion
-    crud.log_user_activity(
+    await async_crud.log_user_activity(
         db=db,
         user_id=current_user.id,
         action="User Deleted",
@@ -156,30 +162,30 @@ def delete_user(
         user_agent=request.headers.get("user-agent")
     )
     
-    crud.delete_user(db, user_id)
+    await async_crud.delete_user(db, user_id)
     return {"message": "User deleted successfully"}
 
 @router.get("/dashboard/stats", response_model=schemas.DashboardStats)
-def get_dashboard_stats(
-    db: Session = Depends(get_db),
+async def get_dashboard_stats(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin)
 ):
     """Get dashboard statistics (admin only)"""
-    return crud.get_dashboard_stats(db)
+    return await async_crud.get_dashboard_stats(db)
 
 @router.get("/{user_id}/activities", response_model=List[schemas.UserActivity])
-def get_user_activities(
+async def get_user_activities(
     user_id: int,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin)
 ):
     """Get user activity logs (admin only)"""
     # Verify user exists
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await async_crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    activities = crud.get_user_activities(db, user_id=user_id, skip=skip, limit=limit)
+    activities = await async_crud.get_user_activities(db, user_id=user_id, skip=skip, limit=limit)
     return activities
@@ -105,6 +105,7 @@ class GoodsBase(BaseModel):
     category: str
     quantity: int
     price_per_unit: float
+    unit_volume: float = 1.0
 
 class GoodsCreate(GoodsBase):
     branch_id: Optional[int] = None
@@ -115,6 +116,7 @@ class GoodsUpdate(BaseModel):
     category: Optional[str] = None
     quantity: Optional[int] = None
     price_per_unit: Optional[float] = None
+    unit_volume: Optional[float] = None
     branch_id: Optional[int] = None
 
 class Goods(GoodsBase):
@@ -134,7 +136,7 @@ class BranchBase(BaseModel):
     description: Optional[str] = None
     image_url: Optional[str] = None
     capacity: Optional[int] = None
-    available_space: Optional[int] = None
+    available_space: Optional[float] = None
 
 class BranchCreate(BranchBase):
     manager_id: Optional[int] = None
@@ -145,12 +147,13 @@ class BranchUpdate(BaseModel):
     description: Optional[str] = None
     image_url: Optional[str] = None
     capacity: Optional[int] = None
-    available_space: Optional[int] = None
+    available_space: Optional[float] = None
     manager_id: Optional[int] = None
 
 class Branch(BranchBase):
     id: int
     manager_id: Optional[int] = None
+    used_capacity: float = 0.0
     created_at: datetime
     
     class Config:
@@ -0,0 +1,86 @@
+"""
+Shared BSON-to-JSON serialization for the MongoDB routers.
+
+Documents coming out of Motor are encoded once, straight to bytes, by orjson.
+ObjectId and Decimal128 values are handled by the encoder's `default` hook in C
+instead of a per-key isinstance() walk in Python, and returning a
+MongoJSONResponse skips FastAPI's jsonable_encoder pass entirely.
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional, Type
+
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    """Encode documents (or any JSON-like content holding BSON types) to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class MongoJSONResponse(JSONResponse):
+    """JSON response rendered by orjson with BSON type support; accepts pre-encoded bytes"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+def bson_utcnow() -> datetime:
+    """Current UTC time truncated to the millisecond precision BSON dates store"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def with_string_id(document: dict) -> dict:
+    """Rename `_id` to a string `id` in place (the shape the frontend expects)"""
+    document["id"] = str(document.pop("_id"))
+    return document
+
+def with_string_ids(documents: Iterable[dict]) -> List[dict]:
+    return [with_string_id(document) for document in documents]
+
+class DocumentProjection:
+    """
+    Mongo projection and response defaults derived from a Pydantic response model.
+
+    Fetching only the model's fields lets documents be encoded as-is while keeping
+    the payload identical to what the response_model would have produced.
+    """
+    def __init__(self, model: Type[BaseModel], exclude: Optional[Iterable[str]] = None):
+        excluded = set(exclude or ())
+        self.fields = [
+            field.alias or name
+            for name, field in model.model_fields.items()
+            if name not in excluded
+        ]
+        self.projection = {key: 1 for key in self.fields}
+        self._field_set = set(self.fields)
+        self.defaults = {
+            field.alias or name: field.default
+            for name, field in model.model_fields.items()
+            if name not in excluded and not field.is_required() and field.default is not PydanticUndefined
+        }
+
+    def apply(self, document: dict) -> dict:
+        """Fill model defaults for fields missing from the stored document"""
+        if len(document) < len(self.fields):
+            for key, value in self.defaults.items():
+                document.setdefault(key, value)
+        return document
+
+    def select(self, document: dict) -> dict:
+        """Project a locally built document as find_one would return it (`_id` first, model fields only)"""
+        projected = {"_id": document["_id"]}
+        for key, value in document.items():
+            if key in self._field_set and key != "_id":
+                projected[key] = value
+        return projected
@@ -33,3 +33,20 @@ class UnauthorizedOperationError(DomainException):
     """Raised when an operation violates role authorization policies."""
     def __init__(self, message: str = "Unauthorized operation for current user role."):
         super().__init__(message)
+
+class InsufficientStockError(DomainException):
+    """Raised when an outward stock movement exceeds the quantity on hand."""
+    def __init__(self, goods_name: str, requested: int, available: int):
+        self.goods_name = goods_name
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Cannot dispatch {requested} items. Only {available} available.")
+
+class ConcurrencyConflictError(DomainException):
+    """Raised when a versioned update loses the race against another writer."""
+    def __init__(self, entity_name: str, entity_id: any, expected_version: int, current_version: int):
+        self.entity_name = entity_name
+        self.entity_id = entity_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(f"{entity_name} '{entity_id}' was modified concurrently. Expected version {expected_version}, current version {current_version}.")
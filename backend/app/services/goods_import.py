@@ -0,0 +1,111 @@
+"""
+Bulk Goods Import (MongoDB goods collection).
+Parses CSV / NDJSON uploads incrementally, validates each row against GoodsCreate
+and writes valid rows with unordered insert_many in fixed-size chunks.
+"""
+import codecs
+import csv
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+
+from app.mongo_models import GoodsCreate
+
+IMPORT_FORMATS = ("csv", "ndjson")
+FORMAT_BY_EXTENSION = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# (row number, parsed row or parse error)
+ParsedRow = Tuple[int, object]
+
+def format_from_filename(filename: Optional[str]) -> Optional[str]:
+    for extension, import_format in FORMAT_BY_EXTENSION.items():
+        if filename and filename.lower().endswith(extension):
+            return import_format
+    return None
+
+def iter_csv_rows(binary_file) -> Iterator[ParsedRow]:
+    """Rows of a CSV upload as dicts; empty cells are dropped so model defaults apply. Row 1 is the header."""
+    text = codecs.getreader("utf-8-sig")(binary_file)
+    reader = csv.DictReader(text)
+    for row_number, row in enumerate(reader, start=2):
+        yield row_number, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+def iter_ndjson_rows(binary_file) -> Iterator[ParsedRow]:
+    for row_number, line in enumerate(binary_file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e}")
+
+def iter_json_rows(rows: Iterable) -> Iterator[ParsedRow]:
+    return enumerate(rows, start=1)
+
+def _row_errors(error: Exception) -> List[str]:
+    if isinstance(error, ValidationError):
+        return [f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()]
+    return [str(error)]
+
+def _validate_chunk(rows: Iterator[ParsedRow], chunk_size: int):
+    """Pull and validate the next chunk of rows (runs in the threadpool)"""
+    documents, row_numbers, errors = [], [], []
+    taken = 0
+    now = datetime.utcnow()
+    for row_number, row in islice(rows, chunk_size):
+        taken += 1
+        try:
+            if isinstance(row, Exception):
+                raise row
+            if not isinstance(row, dict):
+                raise ValueError("Row must be an object")
+            document = GoodsCreate.model_validate(row).model_dump()
+        except (ValidationError, ValueError) as e:
+            errors.append({"row": row_number, "errors": _row_errors(e)})
+            continue
+        document["created_at"] = now
+        document["updated_at"] = now
+        document["sqlite_id"] = -1  # same marker as goods created through the API
+        documents.append(document)
+        row_numbers.append(row_number)
+    return taken, documents, row_numbers, errors
+
+async def import_goods_rows(collection, rows: Iterator[ParsedRow], chunk_size: int, max_reported_errors: int) -> dict:
+    """Validate and insert rows chunk by chunk; returns a row-level report"""
+    started = time.perf_counter()
+    report = {"received": 0, "inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def record(errors):
+        report["failed"] += len(errors)
+        room = max_reported_errors - len(report["errors"])
+        report["errors"].extend(errors[:room])
+        if len(errors) > room:
+            report["errors_truncated"] = True
+
+    while True:
+        taken, documents, row_numbers, errors = await run_in_threadpool(_validate_chunk, rows, chunk_size)
+        if not taken:
+            break
+        report["received"] += taken
+        record(errors)
+        if not documents:
+            continue
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            report["inserted"] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered: every row without a write error was inserted
+            report["inserted"] += e.details.get("nInserted", 0)
+            record([
+                {"row": row_numbers[write_error["index"]], "errors": [write_error.get("errmsg", "Write failed")]}
+                for write_error in e.details.get("writeErrors", [])
+            ])
+
+    report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
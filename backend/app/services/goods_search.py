@@ -0,0 +1,64 @@
+"""
+Goods Search Query Builder (MongoDB goods collection).
+Weighted text-index search with an index-backed exact SKU prefix fast path.
+"""
+import re
+from typing import List, Optional, Tuple
+
+SEARCH_MODES = ("auto", "text", "sku")
+
+TEXT_INDEX_NAME = "goods_text_search"
+TEXT_INDEX_FIELDS = [("name", "text"), ("sku", "text"), ("supplier", "text"), ("description", "text")]
+TEXT_INDEX_WEIGHTS = {"name": 10, "sku": 8, "supplier": 3, "description": 1}
+
+RELEVANCE_SORT = [("score", {"$meta": "textScore"}), ("created_at", -1), ("_id", -1)]
+
+# Single token made of SKU characters, e.g. "WH-1042" or "ACME.77/B"
+SKU_TOKEN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._/-]*$")
+
+# Server error code returned when $text runs without a text index
+TEXT_INDEX_MISSING = 27
+
+def looks_like_sku(search: str) -> bool:
+    return bool(SKU_TOKEN.match(search))
+
+def sku_prefix_filter(search: str) -> dict:
+    """Anchored, case-sensitive prefix match; served as a range scan on the sku index"""
+    return {"sku": {"$regex": "^" + re.escape(search)}}
+
+def text_search_filter(search: str) -> dict:
+    return {"$text": {"$search": search}}
+
+def legacy_regex_filter(search: str) -> dict:
+    """Unanchored case-insensitive scan, only used when the text index is missing"""
+    pattern = re.escape(search)
+    return {
+        "$or": [
+            {"name": {"$regex": pattern, "$options": "i"}},
+            {"description": {"$regex": pattern, "$options": "i"}},
+            {"sku": {"$regex": pattern, "$options": "i"}},
+            {"supplier": {"$regex": pattern, "$options": "i"}}
+        ]
+    }
+
+def search_plans(search: str, mode: str) -> List[Tuple[str, dict, Optional[list]]]:
+    """
+    Ordered (name, filter, sort) plans to try for a search term.
+
+    In auto mode a single SKU-shaped token first tries the SKU prefix path and only
+    falls back to the text index when no SKU matches.
+    """
+    plans = []
+    if mode == "sku" or (mode == "auto" and looks_like_sku(search)):
+        plans.append(("sku", sku_prefix_filter(search), [("sku", 1), ("_id", 1)]))
+    if mode in ("auto", "text"):
+        plans.append(("text", text_search_filter(search), RELEVANCE_SORT))
+    return plans
+
+def combine_filters(*filters: dict) -> dict:
+    filters = [f for f in filters if f]
+    if not filters:
+        return {}
+    if len(filters) == 1:
+        return filters[0]
+    return {"$and": filters}
@@ -2,62 +2,141 @@
 Goods & Inventory Domain Service.
 Encapsulates stock adjustments, storage validation, and branch capacity checks.
 """
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app import crud, schemas
-from app.services.exceptions import EntityNotFoundError, InsufficientCapacityError
+from app import async_crud, crud, schemas
+from app.database import Goods
+from app.services.exceptions import (
+    ConcurrencyConflictError,
+    EntityNotFoundError,
+    InsufficientCapacityError,
+    InsufficientStockError,
+)
+from app.services.retry import DEFAULT_RETRY, NO_RETRY, RetryPolicy
+
+def _check_branch_capacity(branch, goods_data: schemas.GoodsCreate):
+    if not branch:
+        return
+    current_used = branch.used_capacity or 0.0
+    requested_volume = crud.goods_footprint(goods_data.quantity, goods_data.unit_volume)
+    if branch.capacity is not None and current_used + requested_volume > branch.capacity:
+        raise InsufficientCapacityError(
+            branch_name=branch.name,
+            requested=requested_volume,
+            available=max(0, branch.capacity - current_used)
+        )
 
 class GoodsService:
     def __init__(self, db: Session):
         self.db = db
 
     def get_goods_item(self, goods_id: int):
-        item = crud.get_goods_item(self.db, goods_id)
+        item = crud.get_good(self.db, goods_id)
         if not item:
             raise EntityNotFoundError("Goods", goods_id)
         return item
 
-    def list_goods(self, skip: int = 0, limit: int = 100, owner_id: Optional[int] = None, branch_id: Optional[int] = None):
-        return crud.get_goods(self.db, skip=skip, limit=limit, owner_id=owner_id, branch_id=branch_id)
+    def list_goods(self, skip: int = 0, limit: int = 100, owner_id: Optional[int] = None, branch_id: Optional[int] = None,
+                   category: Optional[str] = None, search: Optional[str] = None, cursor: Optional[str] = None):
+        return crud.get_goods(self.db, skip=skip, limit=limit, category=category, search=search,
+                              owner_id=owner_id, branch_id=branch_id, cursor=cursor)
 
     def create_goods(self, goods_data: schemas.GoodsCreate, owner_id: int):
         # Verify branch capacity if allocated to a branch
         if goods_data.branch_id:
-            branch = crud.get_branch(self.db, goods_data.branch_id)
-            if branch:
-                current_used = crud.get_branch_used_capacity(self.db, goods_data.branch_id)
-                requested_volume = (goods_data.quantity or 1) * (goods_data.unit_volume or 1.0)
-                if current_used + requested_volume > branch.capacity:
-                    raise InsufficientCapacityError(
-                        branch_name=branch.name,
-                        requested=requested_volume,
-                        available=max(0, branch.capacity - current_used)
-                    )
+            _check_branch_capacity(crud.get_branch(self.db, goods_data.branch_id), goods_data)
         return crud.create_goods(self.db, goods_data, owner_id=owner_id)
 
-    def update_stock(self, goods_id: int, quantity_change: int, user_id: int, expected_version: Optional[int] = None):
-        item = self.get_goods_item(goods_id)
-        if expected_version is not None and item.version != expected_version:
-            raise ValueError(f"Concurrency error: Item version mismatch. Current version: {item.version}, expected: {expected_version}")
-
-        new_quantity = item.quantity + quantity_change
-        if new_quantity < 0:
-            raise ValueError("Stock quantity cannot be negative.")
-        
-        item.quantity = new_quantity
-        item.version = (item.version or 1) + 1
-        self.db.commit()
-        self.db.refresh(item)
-        
+    def update_stock(self, goods_id: int, quantity_change: int, user_id: int, expected_version: Optional[int] = None,
+                     retry: RetryPolicy = DEFAULT_RETRY) -> Goods:
+        """
+        Apply a stock delta as one conditional UPDATE ... RETURNING (no read first)
+        and return the updated Goods entity, loaded from the RETURNING row.
+
+        The version pin and the non-negative check are evaluated by the database, so
+        concurrent workers cannot both pass them. Pinned callers get a
+        ConcurrencyConflictError on a lost race; unpinned callers retry transient
+        lock errors according to `retry`.
+        """
+        policy = retry if expected_version is None else NO_RETRY
+        goods = policy.run(
+            lambda: self._apply_stock_change(goods_id, quantity_change, expected_version),
+            on_retry=lambda error: self.db.rollback(),
+        )
+        if goods is None:
+            self.db.rollback()
+            self._raise_stock_rejection(goods_id, quantity_change, expected_version)
+
         activity_type = "STOCK_INCREASE" if quantity_change > 0 else "STOCK_DECREASE"
-        crud.create_user_activity(
+        crud.log_user_activity(
             self.db,
             user_id=user_id,
-            activity_type=activity_type,
-            description=f"Adjusted stock for '{item.name}' by {quantity_change}. New total: {new_quantity} (v{item.version})"
+            action=activity_type,
+            description=f"Adjusted stock for '{goods.name}' by {quantity_change}. New total: {goods.quantity} (v{goods.version})",
+            category="goods"
         )
-        return item
+        return goods
+
+    def _apply_stock_change(self, goods_id: int, quantity_change: int, expected_version: Optional[int]) -> Optional[Goods]:
+        conditions = [Goods.id == goods_id, Goods.quantity + quantity_change >= 0]
+        if expected_version is not None:
+            conditions.append(Goods.version == expected_version)
+        # ORM-enabled UPDATE ... RETURNING Goods: the entity comes back from the same statement,
+        # replacing any stale copy already in the session
+        goods = self.db.scalars(
+            update(Goods)
+            .where(*conditions)
+            .values(
+                quantity=Goods.quantity + quantity_change,
+                version=Goods.version + 1,
+                updated_at=datetime.utcnow(),
+            )
+            .returning(Goods)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).first()
+        if goods is not None:
+            crud.adjust_branch_usage(self.db, goods.branch_id, crud.goods_footprint(quantity_change, goods.unit_volume))
+            self.db.commit()
+        return goods
+
+    def _raise_stock_rejection(self, goods_id: int, quantity_change: int, expected_version: Optional[int]):
+        """Explain why the conditional update matched no row (failure path only)"""
+        item = crud.get_good(self.db, goods_id)
+        if not item:
+            raise EntityNotFoundError("Goods", goods_id)
+        if expected_version is not None and item.version != expected_version:
+            raise ConcurrencyConflictError("Goods", goods_id, expected_version, item.version)
+        raise InsufficientStockError(item.name, -quantity_change, item.quantity)
 
     def delete_goods(self, goods_id: int):
         item = self.get_goods_item(goods_id)
         return crud.delete_goods(self.db, goods_id)
+
+class AsyncGoodsService:
+    """GoodsService reads, creation and deletion for AsyncSession-based handlers."""
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_goods_item(self, goods_id: int):
+        item = await async_crud.get_good(self.db, goods_id)
+        if not item:
+            raise EntityNotFoundError("Goods", goods_id)
+        return item
+
+    async def list_goods(self, skip: int = 0, limit: int = 100, owner_id: Optional[int] = None,
+                         branch_id: Optional[int] = None, category: Optional[str] = None,
+                         search: Optional[str] = None, cursor: Optional[str] = None):
+        return await async_crud.get_goods(self.db, skip=skip, limit=limit, category=category, search=search,
+                                          owner_id=owner_id, branch_id=branch_id, cursor=cursor)
+
+    async def create_goods(self, goods_data: schemas.GoodsCreate, owner_id: int):
+        if goods_data.branch_id:
+            _check_branch_capacity(await async_crud.get_branch(self.db, goods_data.branch_id), goods_data)
+        return await async_crud.create_goods(self.db, goods_data, owner_id=owner_id)
+
+    async def delete_goods(self, goods_id: int):
+        await self.get_goods_item(goods_id)
+        return await async_crud.delete_goods(self.db, goods_id)
@@ -0,0 +1,37 @@
+"""
+Bounded retry with full jitter for transient database contention.
+"""
+import random
+import time
+from sqlalchemy.exc import OperationalError
+
+# SQLite reports lock contention as OperationalError with one of these messages
+TRANSIENT_ERRORS = ("database is locked", "database table is locked", "busy")
+
+def is_transient(error: Exception) -> bool:
+    return isinstance(error, OperationalError) and any(text in str(error).lower() for text in TRANSIENT_ERRORS)
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 3, base_delay: float = 0.02, max_delay: float = 0.25):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def run(self, operation, on_retry=None):
+        """Run operation(), retrying transient errors up to `attempts` times in total"""
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt == self.attempts or not is_transient(e):
+                    raise
+                if on_retry is not None:
+                    on_retry(e)
+                time.sleep(self.backoff(attempt))
+
+NO_RETRY = RetryPolicy(attempts=1)
+DEFAULT_RETRY = RetryPolicy()
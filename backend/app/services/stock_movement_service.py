@@ -0,0 +1,188 @@
+"""
+Stock Movement Domain Service (MongoDB goods collection).
+Applies inward, outward and adjustment movements atomically, singly or as one bulk write per batch.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.services.exceptions import EntityNotFoundError, InsufficientStockError
+
+MOVEMENT_TYPES = ("inward", "outward", "adjustment")
+
+# Set to the batch id by every batch write, so a batch can tell which of its writes applied
+LAST_BATCH_FIELD = "last_movement_batch"
+
+class StockMovementService:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def apply_movement(self, goods_id: str, movement_type: str, quantity: int) -> Tuple[int, dict]:
+        """
+        Apply a single stock movement and return (previous_quantity, updated_goods).
+
+        Inward/outward movements are a conditional $inc evaluated by the server, so
+        concurrent dispatches against the same SKU can never overwrite each other or
+        push the quantity below zero.
+        """
+        if movement_type not in MOVEMENT_TYPES:
+            raise ValueError(f"Unknown stock movement type: {movement_type}")
+
+        object_id = ObjectId(goods_id)
+        now = datetime.utcnow()
+
+        if movement_type == "adjustment":
+            # For adjustments quantity is the new total; the pre-image gives us the
+            # previous quantity and the post-image is rebuilt locally.
+            goods = await self.collection.find_one_and_update(
+                {"_id": object_id},
+                {"$set": {"quantity": quantity, "updated_at": now}},
+                return_document=ReturnDocument.BEFORE,
+            )
+            if goods is None:
+                raise EntityNotFoundError("Goods", goods_id)
+            previous_quantity = goods.get("quantity", 0)
+            goods["quantity"] = quantity
+            goods["updated_at"] = now
+            return previous_quantity, goods
+
+        delta = quantity if movement_type == "inward" else -quantity
+        query = {"_id": object_id}
+        if movement_type == "outward":
+            query["quantity"] = {"$gte": quantity}
+
+        goods = await self.collection.find_one_and_update(
+            query,
+            {"$inc": {"quantity": delta}, "$set": {"updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if goods is None:
+            await self._raise_rejection(goods_id, object_id, quantity)
+        return goods["quantity"] - delta, goods
+
+    async def _raise_rejection(self, goods_id: str, object_id: ObjectId, requested: int):
+        """Explain why a guarded movement matched nothing (failure path only)."""
+        goods = await self.collection.find_one({"_id": object_id}, {"name": 1, "quantity": 1})
+        if goods is None:
+            raise EntityNotFoundError("Goods", goods_id)
+        raise InsufficientStockError(
+            goods_name=goods.get("name", goods_id),
+            requested=requested,
+            available=goods.get("quantity", 0),
+        )
+
+    async def apply_batch(self, movements: List) -> List[dict]:
+        """
+        Apply many movements with one unordered bulk_write and return per-line results.
+
+        Lines for the same goods are merged into one guarded operation (see
+        _merge_lines), so every write targets a distinct document. Each write also
+        stamps the document with this batch's id; when the bulk result matched
+        fewer documents than it wrote, one find over the touched ids settles which
+        lines applied (stamped), which goods are missing, and which outward lines
+        were rejected by their stock guard.
+        """
+        results: List[dict] = [None] * len(movements)
+        lines_by_goods: Dict[str, List[int]] = {}
+        for index, movement in enumerate(movements):
+            if movement.type not in MOVEMENT_TYPES:
+                results[index] = self._line_result(index, movement, "invalid", "Invalid stock update type. Must be 'inward', 'outward', or 'adjustment'")
+                continue
+            if not ObjectId.is_valid(movement.good_id):
+                results[index] = self._line_result(index, movement, "invalid", "Invalid goods ID format")
+                continue
+            lines_by_goods.setdefault(movement.good_id, []).append(index)
+
+        batch_id = ObjectId()
+        now = datetime.utcnow()
+        groups = []  # (goods ObjectId, line indexes, required stock or None when unguarded)
+        operations = []
+        for good_id, indexes in lines_by_goods.items():
+            lines = [movements[index] for index in indexes]
+            if len(lines) > 1 and any(line.type == "adjustment" for line in lines):
+                for index in indexes:
+                    results[index] = self._line_result(index, movements[index], "invalid", "An adjustment cannot be combined with other movements of the same goods in one batch")
+                continue
+            query, update, required = self._merge_lines(lines, batch_id, now)
+            groups.append((query["_id"], indexes, required))
+            operations.append(UpdateOne(query, update))
+
+        if not operations:
+            return results
+
+        failed = {}
+        try:
+            matched = (await self.collection.bulk_write(operations, ordered=False)).matched_count
+        except BulkWriteError as e:
+            matched = e.details.get("nMatched", 0)
+            failed = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+
+        stamped, existing = set(), set()
+        if matched < len(operations) - len(failed):
+            cursor = self.collection.find({"_id": {"$in": [group[0] for group in groups]}}, {LAST_BATCH_FIELD: 1})
+            async for document in cursor:
+                existing.add(document["_id"])
+                if document.get(LAST_BATCH_FIELD) == batch_id:
+                    stamped.add(document["_id"])
+        else:
+            stamped = {group[0] for position, group in enumerate(groups) if position not in failed}
+
+        for position, (object_id, indexes, required) in enumerate(groups):
+            if position in failed:
+                status, detail = "failed", failed[position]
+            elif object_id in stamped:
+                status, detail = "applied", None
+            elif object_id not in existing:
+                status, detail = "not_found", "Goods not found"
+            elif required is not None:
+                # Not stamped: the guard refused it (or, within the microseconds before
+                # the find, a concurrent batch applied on top and re-stamped the goods)
+                status, detail = "rejected", f"Insufficient stock to dispatch {required} items"
+                if len(indexes) > 1:
+                    detail += f" across {len(indexes)} lines for these goods"
+            else:
+                # Unguarded write on existing goods, re-stamped by a concurrent batch since
+                status, detail = "applied", None
+            for index in indexes:
+                results[index] = self._line_result(index, movements[index], status, detail)
+        return results
+
+    @staticmethod
+    def _merge_lines(lines: List, batch_id: ObjectId, now: datetime) -> Tuple[dict, dict, Optional[int]]:
+        """
+        One update for all of a batch's lines on the same goods: (query, update, required stock).
+
+        Inward/outward lines become a single $inc of their net delta, guarded by the
+        stock the lines need at their lowest point in batch order, so the merged write
+        applies exactly when every line would have applied in turn. An adjustment is
+        always alone (apply_batch rejects mixing it with other lines).
+        """
+        object_id = ObjectId(lines[0].good_id)
+        stamp = {"updated_at": now, LAST_BATCH_FIELD: batch_id}
+        if lines[0].type == "adjustment":
+            return {"_id": object_id}, {"$set": {"quantity": lines[0].quantity, **stamp}}, None
+
+        delta = lowest = 0
+        for line in lines:
+            delta += line.quantity if line.type == "inward" else -line.quantity
+            lowest = min(lowest, delta)
+        query = {"_id": object_id}
+        required = None
+        if lowest < 0:
+            required = -lowest
+            query["quantity"] = {"$gte": required}
+        return query, {"$inc": {"quantity": delta}, "$set": stamp}, required
+
+    @staticmethod
+    def _line_result(index: int, movement, status: str, detail: str = None) -> dict:
+        return {
+            "index": index,
+            "good_id": movement.good_id,
+            "type": movement.type,
+            "quantity": movement.quantity,
+            "reason": movement.reason,
+            "status": status,
+            "detail": detail,
+        }
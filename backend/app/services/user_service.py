@@ -20,8 +20,8 @@ class UserService:
     def get_user_by_username(self, username: str):
         return crud.get_user_by_username(self.db, username)
 
-    def list_users(self, skip: int = 0, limit: int = 100):
-        return crud.get_users(self.db, skip=skip, limit=limit)
+    def list_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        return crud.get_users(self.db, skip=skip, limit=limit, cursor=cursor)
 
     def register_user(self, user_data: schemas.UserCreate):
         existing_username = crud.get_user_by_username(self.db, user_data.username)
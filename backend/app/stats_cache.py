@@ -0,0 +1,99 @@
+"""
+Short-TTL cache for dashboard statistics.
+
+Each stats domain is computed by one grouped query and kept for
+STATS_CACHE_TTL_SECONDS, so dashboards polled by many admins cost one query per
+window. Writes that change the underlying counts call invalidate() so the next
+read recomputes. Concurrent misses for the same key share a single computation.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+DASHBOARD_STATS = "dashboard"
+APPLICATION_STATS = "applications"
+
+class StatsCache:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # key -> (expires_at, generation, value)
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._async_key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic() or entry[1] != self._generations.get(key, 0):
+                return None
+            self.hits += 1
+            return entry[2]
+
+    def _store(self, key: str, generation: int, value: Any):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            # A write that landed while the value was being computed wins; don't cache stale counts
+            if generation == self._generations.get(key, 0):
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, generation, value)
+
+    def _generation(self, key: str) -> int:
+        with self._lock:
+            self.misses += 1
+            return self._generations.get(key, 0)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key)
+            if value is None:
+                generation = self._generation(key)
+                value = loader()
+                self._store(key, generation, value)
+            return value
+
+    async def get_or_load_async(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        key_lock = self._async_key_locks.setdefault(key, asyncio.Lock())
+        async with key_lock:
+            value = self.get(key)
+            if value is None:
+                generation = self._generation(key)
+                value = await loader()
+                self._store(key, generation, value)
+            return value
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+stats_cache = StatsCache(settings.STATS_CACHE_TTL_SECONDS)
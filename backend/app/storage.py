@@ -0,0 +1,111 @@
+"""
+File storage backends for uploaded documents.
+
+Uploads are blocking network/disk I/O, so the async helpers run them in the
+threadpool and stream the UploadFile in UPLOAD_CHUNK_SIZE pieces instead of
+reading whole files into memory. STORAGE_BACKEND selects Cloudinary (default,
+credentials from CLOUDINARY_*) or a local-filesystem stand-in for development
+and tests.
+"""
+import os
+import shutil
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+
+settings = get_settings()
+
+STORAGE_BACKENDS = ("cloudinary", "local")
+CLOUDINARY_SETTINGS = ("CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_KEY", "CLOUDINARY_API_SECRET")
+
+class StorageBackend(ABC):
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+
+    @abstractmethod
+    def upload(self, fileobj, folder: str, public_id: str, filename: Optional[str] = None) -> str:
+        """Store a file-like object and return its public URL (blocking)"""
+
+    @abstractmethod
+    def delete(self, folder: str, url: str) -> None:
+        """Remove a previously stored file by the URL upload() returned (blocking)"""
+
+    async def upload_async(self, upload: Optional[UploadFile], folder: str, prefix: str) -> Optional[str]:
+        """Upload an optional form file off the event loop; None when no file was sent"""
+        if upload is None or not upload.filename:
+            return None
+        public_id = f"{prefix}_{datetime.utcnow().timestamp()}"
+        return await run_in_threadpool(self.upload, upload.file, folder, public_id, upload.filename)
+
+    async def delete_async(self, folder: str, url: Optional[str]) -> None:
+        if url:
+            await run_in_threadpool(self.delete, folder, url)
+
+class CloudinaryStorage(StorageBackend):
+    def __init__(self, chunk_size: int, cloud_name: str, api_key: str, api_secret: str):
+        super().__init__(chunk_size)
+        import cloudinary
+        import cloudinary.uploader
+
+        cloudinary.config(cloud_name=cloud_name, api_key=api_key, api_secret=api_secret)
+        self._uploader = cloudinary.uploader
+
+    def upload(self, fileobj, folder: str, public_id: str, filename: Optional[str] = None) -> str:
+        # upload_large sends the stream in chunk_size parts instead of one buffered request
+        result = self._uploader.upload_large(
+            fileobj,
+            folder=folder,
+            resource_type="auto",
+            public_id=public_id,
+            chunk_size=self.chunk_size,
+        )
+        return result["secure_url"]
+
+    def delete(self, folder: str, url: str) -> None:
+        public_id = url.split("/")[-1].split(".")[0]
+        self._uploader.destroy(f"{folder}/{public_id}")
+
+class LocalFileStorage(StorageBackend):
+    def __init__(self, root: str, chunk_size: int):
+        super().__init__(chunk_size)
+        self.root = Path(root).resolve()
+
+    def upload(self, fileobj, folder: str, public_id: str, filename: Optional[str] = None) -> str:
+        directory = self.root / folder
+        directory.mkdir(parents=True, exist_ok=True)
+        extension = os.path.splitext(filename or "")[1]
+        target = directory / f"{public_id}{extension}"
+        with open(target, "wb") as destination:
+            shutil.copyfileobj(fileobj, destination, self.chunk_size)
+        return target.as_uri()
+
+    def delete(self, folder: str, url: str) -> None:
+        path = Path(unquote(urlparse(url).path)).resolve()
+        if self.root in path.parents:
+            path.unlink(missing_ok=True)
+
+@lru_cache()
+def get_storage() -> StorageBackend:
+    """FastAPI dependency returning the configured storage backend (also called at startup to fail fast)"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalFileStorage(settings.LOCAL_STORAGE_DIR, settings.UPLOAD_CHUNK_SIZE)
+    if settings.STORAGE_BACKEND == "cloudinary":
+        missing = [name for name in CLOUDINARY_SETTINGS if not getattr(settings, name)]
+        if missing:
+            raise ValueError(f"STORAGE_BACKEND 'cloudinary' requires {', '.join(missing)} to be set "
+                             f"(or use STORAGE_BACKEND=local)")
+        return CloudinaryStorage(
+            settings.UPLOAD_CHUNK_SIZE,
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}', expected one of {STORAGE_BACKENDS}")
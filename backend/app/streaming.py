@@ -0,0 +1,89 @@
+"""
+Streaming NDJSON/CSV exports straight from a Motor cursor.
+
+Documents are pulled EXPORT_BATCH_SIZE at a time and written out in ~64KB
+chunks, so memory stays flat no matter how large the collection is.
+"""
+import csv
+import io
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.serialization import dumps
+
+settings = get_settings()
+
+EXPORT_FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+CHUNK_BYTES = 64 * 1024
+
+def validate_export_format(export_format: str) -> str:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid export format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    return export_format
+
+def export_fields(model, exclude=()) -> List[str]:
+    """CSV columns for a response model: `id` first, then the model's fields in order"""
+    names = [field.alias or name for name, field in model.model_fields.items() if name not in exclude]
+    return ["id"] + [name for name in names if name not in ("id", "_id")]
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return str(value)
+
+def _export_document(document: dict) -> dict:
+    if "_id" in document:
+        document["id"] = str(document.pop("_id"))
+    return document
+
+async def ndjson_chunks(cursor) -> AsyncIterator[bytes]:
+    chunk = bytearray()
+    async for document in cursor:
+        chunk += dumps(_export_document(document))
+        chunk += b"\n"
+        if len(chunk) >= CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+async def csv_chunks(cursor, fields: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for document in cursor:
+        document = _export_document(document)
+        writer.writerow([_csv_value(document.get(field)) for field in fields])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def export_response(cursor, export_format: str, fields: List[str], filename: str,
+                    batch_size: Optional[int] = None) -> StreamingResponse:
+    """Stream a Motor cursor as an attachment in the requested format"""
+    cursor = cursor.batch_size(batch_size or settings.EXPORT_BATCH_SIZE)
+    if export_format == "csv":
+        body = csv_chunks(cursor, fields)
+    else:
+        body = ndjson_chunks(cursor)
+    timestamp = datetime.utcnow().strftime("%Y%m%d")
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}_{timestamp}.{export_format}"'},
+    )
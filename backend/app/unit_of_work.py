@@ -2,8 +2,9 @@
 Unit of Work Pattern for atomic database transactions.
 """
 from abc import ABC, abstractmethod
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal, SessionLocal
 
 class AbstractUnitOfWork(ABC):
     session: Session
@@ -42,3 +43,29 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
 
     def rollback(self):
         self.session.rollback()
+
+class AsyncSqlAlchemyUnitOfWork:
+    """Async counterpart of SqlAlchemyUnitOfWork for AsyncSession-based handlers."""
+    session: AsyncSession
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def __aenter__(self):
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is not None:
+                await self.rollback()
+            else:
+                await self.commit()
+        finally:
+            await self.session.close()
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
@@ -0,0 +1,102 @@
+"""
+Goods Pagination Benchmark: offset (.skip) vs keyset (cursor)
+Seeds a scratch collection with 1M goods and times deep pages in both modes.
+
+Run from the backend directory against a scratch MongoDB:
+    python scripts/benchmark_pagination.py --documents 1000000 --limit 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import get_settings
+from app.pagination import MONGO_KEYSET_SORT, encode_cursor, mongo_keyset_filter
+
+BENCHMARK_COLLECTION = "benchmark_goods_pagination"
+SEED_BATCH_SIZE = 10000
+PAGES = [1, 10, 100, 1000, 5000, 25000]
+
+async def seed(collection, documents):
+    await collection.drop()
+    start = datetime(2024, 1, 1)
+    for offset in range(0, documents, SEED_BATCH_SIZE):
+        batch = [
+            {
+                "name": f"Benchmark Item {n}",
+                "category": f"category-{n % 25}",
+                "sku": f"BENCH-{n:07d}",
+                "quantity": n % 500,
+                "price_per_unit": 9.99,
+                "created_at": start + timedelta(seconds=n // 3),  # duplicate timestamps exercise the _id tie-break
+                "updated_at": start,
+            }
+            for n in range(offset, min(offset + SEED_BATCH_SIZE, documents))
+        ]
+        await collection.insert_many(batch, ordered=False)
+    await collection.create_index(MONGO_KEYSET_SORT)
+    print(f"🌱 Seeded {documents:,} goods")
+
+async def time_call(coro_factory, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded collection")
+    parser.add_argument("--mongodb-url", default=get_settings().MONGODB_URL)
+    parser.add_argument("--database", default=get_settings().MONGODB_DB_NAME)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongodb_url)
+    collection = client[args.database][BENCHMARK_COLLECTION]
+
+    try:
+        if not args.skip_seed:
+            await seed(collection, args.documents)
+
+        print("=" * 60)
+        print(f"📄 PAGINATION BENCHMARK ({args.documents:,} goods, limit {args.limit})")
+        print("=" * 60)
+        print(f"{'page':>8} | {'offset (ms)':>12} | {'cursor (ms)':>12}")
+        print("-" * 40)
+
+        for page in PAGES:
+            skip = (page - 1) * args.limit
+            if skip >= args.documents:
+                break
+
+            async def offset_page():
+                return await collection.find().sort(MONGO_KEYSET_SORT).skip(skip).limit(args.limit).to_list(args.limit)
+
+            # Build the cursor a client would hold after reading page - 1 (not timed)
+            cursor = ""
+            if skip:
+                boundary = await collection.find({}, {"created_at": 1}).sort(MONGO_KEYSET_SORT).skip(skip - 1).limit(1).to_list(1)
+                cursor = encode_cursor(boundary[0]["created_at"], boundary[0]["_id"])
+
+            async def cursor_page():
+                return await collection.find(mongo_keyset_filter(cursor)).sort(MONGO_KEYSET_SORT).limit(args.limit).to_list(args.limit)
+
+            offset_ms = await time_call(offset_page)
+            cursor_ms = await time_call(cursor_page)
+            print(f"{page:>8} | {offset_ms:>12.2f} | {cursor_ms:>12.2f}")
+
+        print("=" * 60)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
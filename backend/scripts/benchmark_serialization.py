@@ -0,0 +1,94 @@
+"""
+Serialization Micro-benchmark: 10k-document goods listing
+Compares the per-key ObjectId walk + jsonable_encoder + JSONResponse path with the
+shared orjson-backed MongoJSONResponse. No database is required.
+
+Run from the backend directory:
+    python scripts/benchmark_serialization.py --documents 10000
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.serialization import MongoJSONResponse, with_string_id
+
+def build_documents(count):
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Pallet Jack {n}",
+            "description": "Heavy duty hydraulic pallet jack, 2500kg capacity",
+            "category": "equipment",
+            "sku": f"EQ-{n:06d}",
+            "supplier": "Acme Logistics",
+            "quantity": n % 300,
+            "price_per_unit": 349.99,
+            "low_stock_threshold": 10,
+            "batch_no": f"B{n % 97}",
+            "expiry_date": None,
+            "owner_id": 7,
+            "branch_id": n % 5,
+            "product_id": str(ObjectId()),
+            "created_at": now - timedelta(minutes=n),
+            "updated_at": now,
+            "sqlite_id": -1,
+        }
+        for n in range(count)
+    ]
+
+def legacy_render(documents):
+    goods_list = []
+    for document in documents:
+        goods_dict = dict(document)
+        goods_dict["id"] = str(goods_dict["_id"])
+        del goods_dict["_id"]
+        for key, value in goods_dict.items():
+            if isinstance(value, ObjectId):
+                goods_dict[key] = str(value)
+        goods_list.append(goods_dict)
+    content = {"goods": goods_list, "total": len(goods_list)}
+    return JSONResponse(jsonable_encoder(content)).body
+
+def shared_render(documents):
+    content = {"goods": [with_string_id(document) for document in documents], "total": len(documents)}
+    return MongoJSONResponse(content).body
+
+def measure(render, documents, repeats):
+    timings = []
+    for _ in range(repeats):
+        batch = copy.deepcopy(documents)  # each run gets fresh documents, as from a cursor
+        started = time.perf_counter()
+        body = render(batch)
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2], len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args()
+
+    documents = build_documents(args.documents)
+    legacy_ms, legacy_bytes = measure(legacy_render, documents, args.repeats)
+    shared_ms, shared_bytes = measure(shared_render, documents, args.repeats)
+
+    print("=" * 60)
+    print(f"🧪 SERIALIZATION BENCHMARK ({args.documents:,} goods documents)")
+    print("=" * 60)
+    print(f"   Legacy walk + jsonable_encoder: {legacy_ms:8.1f} ms ({legacy_bytes:,} bytes)")
+    print(f"   MongoJSONResponse (orjson):     {shared_ms:8.1f} ms ({shared_bytes:,} bytes)")
+    print(f"   Speed-up:                       {legacy_ms / shared_ms:8.1f}x")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
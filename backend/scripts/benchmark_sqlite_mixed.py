@@ -0,0 +1,134 @@
+"""
+SQLite Mixed Read/Write Benchmark: rollback journal vs tuned WAL profile
+Dashboard-style aggregate readers run alongside stock-update writers against a
+scratch database, first with the legacy engine (default journal, no pragmas)
+and then with the engine built by app.database.build_engine.
+
+Run from the backend directory:
+    python scripts/benchmark_sqlite_mixed.py --readers 8 --writers 2 --seconds 10
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from app.database import Base, Goods, build_engine
+
+CATEGORIES = ["electronics", "furniture", "equipment", "documents", "food", "clothing"]
+
+def seed(engine, goods):
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": f"Benchmark Item {n}",
+            "category": CATEGORIES[n % len(CATEGORIES)],
+            "quantity": 100,
+            "price_per_unit": 9.99,
+            "created_at": now,
+            "updated_at": now,
+            "version": 1,
+        }
+        for n in range(goods)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(Goods), rows)
+
+def dashboard_read(connection):
+    """Grouped stock summary, the shape of the dashboard statistics queries"""
+    return connection.execute(
+        select(Goods.category, func.count(Goods.id), func.sum(Goods.quantity * Goods.price_per_unit))
+        .group_by(Goods.category)
+    ).all()
+
+def stock_write(connection, goods):
+    connection.execute(
+        update(Goods)
+        .where(Goods.id == random.randint(1, goods))
+        .values(quantity=Goods.quantity + random.choice((-1, 1)), version=Goods.version + 1)
+    )
+
+def run_mixed(engine, goods, readers, writers, seconds):
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {"reads": [], "writes": 0, "locked": 0}
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    dashboard_read(connection)
+            except OperationalError:
+                with lock:
+                    results["locked"] += 1
+                continue
+            with lock:
+                results["reads"].append((time.perf_counter() - started) * 1000)
+
+    def writer():
+        while not stop.is_set():
+            try:
+                with engine.begin() as connection:
+                    stock_write(connection, goods)
+            except OperationalError:
+                with lock:
+                    results["locked"] += 1
+                continue
+            with lock:
+                results["writes"] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+def report(label, results, seconds):
+    reads = sorted(results["reads"])
+    p50 = reads[len(reads) // 2] if reads else 0.0
+    p95 = reads[int(len(reads) * 0.95)] if reads else 0.0
+    print(f"   {label:<18} reads/s={len(reads) / seconds:8.1f}  read p50={p50:7.2f} ms  p95={p95:7.2f} ms  "
+          f"writes/s={results['writes'] / seconds:8.1f}  locked={results['locked']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--goods", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🗄️  SQLITE MIXED BENCHMARK ({args.readers} readers, {args.writers} writers, {args.seconds:.0f}s)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        legacy_url = f"sqlite:///{os.path.join(scratch, 'legacy.db')}"
+        legacy_engine = create_engine(legacy_url, connect_args={"check_same_thread": False})
+        seed(legacy_engine, args.goods)
+        report("legacy journal", run_mixed(legacy_engine, args.goods, args.readers, args.writers, args.seconds), args.seconds)
+        legacy_engine.dispose()
+
+        tuned_engine = build_engine(f"sqlite:///{os.path.join(scratch, 'tuned.db')}")
+        seed(tuned_engine, args.goods)
+        report("WAL profile", run_mixed(tuned_engine, args.goods, args.readers, args.writers, args.seconds), args.seconds)
+        tuned_engine.dispose()
+
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Stock Movement Concurrency Benchmark
+Fires thousands of parallel dispatches at a single SKU and compares the legacy
+read-modify-write path with the atomic conditional $inc movement engine.
+
+Run from the backend directory against a scratch MongoDB:
+    python scripts/benchmark_stock_concurrency.py --dispatches 5000 --initial-stock 4000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import get_settings
+from app.services.exceptions import InsufficientStockError
+from app.services.stock_movement_service import StockMovementService
+
+BENCHMARK_COLLECTION = "benchmark_stock_movements"
+
+async def legacy_dispatch(collection, goods_id, quantity):
+    """The previous find_one -> compute -> $set -> find_one implementation"""
+    existing = await collection.find_one({"_id": goods_id})
+    current_quantity = existing.get("quantity", 0)
+    if quantity > current_quantity:
+        return False
+    await collection.update_one(
+        {"_id": goods_id},
+        {"$set": {"quantity": current_quantity - quantity, "updated_at": datetime.utcnow()}}
+    )
+    await collection.find_one({"_id": goods_id})
+    return True
+
+async def atomic_dispatch(service, goods_id, quantity):
+    try:
+        await service.apply_movement(str(goods_id), "outward", quantity)
+        return True
+    except InsufficientStockError:
+        return False
+
+async def run_round(label, collection, dispatch, dispatches, initial_stock):
+    await collection.delete_many({})
+    result = await collection.insert_one({
+        "name": "Benchmark SKU",
+        "sku": "BENCH-0001",
+        "quantity": initial_stock,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    })
+    goods_id = result.inserted_id
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(dispatch(goods_id, 1) for _ in range(dispatches)))
+    elapsed = time.perf_counter() - started
+
+    accepted = sum(1 for ok in outcomes if ok)
+    final = (await collection.find_one({"_id": goods_id}))["quantity"]
+    expected = initial_stock - accepted
+    lost_updates = final - expected
+
+    print(f"\n📦 {label}")
+    print(f"   Dispatches fired:  {dispatches}")
+    print(f"   Accepted:          {accepted}")
+    print(f"   Rejected:          {dispatches - accepted}")
+    print(f"   Final quantity:    {final} (expected {expected})")
+    print(f"   Lost updates:      {lost_updates}")
+    print(f"   Oversold:          {'yes' if final < 0 or accepted > initial_stock else 'no'}")
+    print(f"   Elapsed:           {elapsed:.2f}s ({dispatches / elapsed:,.0f} movements/s)")
+    return lost_updates
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dispatches", type=int, default=5000)
+    parser.add_argument("--initial-stock", type=int, default=4000)
+    parser.add_argument("--mongodb-url", default=get_settings().MONGODB_URL)
+    parser.add_argument("--database", default=get_settings().MONGODB_DB_NAME)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongodb_url)
+    collection = client[args.database][BENCHMARK_COLLECTION]
+    service = StockMovementService(collection)
+
+    print("=" * 60)
+    print("⚡ STOCK MOVEMENT CONCURRENCY BENCHMARK")
+    print("=" * 60)
+
+    try:
+        await run_round(
+            "Legacy read-modify-write",
+            collection,
+            lambda goods_id, qty: legacy_dispatch(collection, goods_id, qty),
+            args.dispatches,
+            args.initial_stock,
+        )
+        lost_updates = await run_round(
+            "Atomic conditional $inc",
+            collection,
+            lambda goods_id, qty: atomic_dispatch(service, goods_id, qty),
+            args.dispatches,
+            args.initial_stock,
+        )
+        print("\n" + "=" * 60)
+        print("✅ Atomic engine lost no updates" if lost_updates == 0 else "❌ Atomic engine lost updates")
+        print("=" * 60)
+    finally:
+        await collection.drop()
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+MongoDB Index Maintenance
+Reconciles the database with the index plan in app/mongo_indexes.py. Missing
+indexes are created; indexes whose options changed are reported, and dropped and
+recreated only with --rebuild. A rebuilt unique index does not enforce anything
+until the new build finishes, so run --rebuild in a maintenance window, from one
+process, while writes to the affected collections are paused.
+
+Run from the backend directory:
+    python scripts/ensure_mongo_indexes.py [--rebuild]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.mongo_indexes import ensure_indexes
+from app.mongodb import close_mongo_connection, connect_to_mongo, get_database
+
+async def run(rebuild: bool) -> dict:
+    await connect_to_mongo()
+    try:
+        return await ensure_indexes(get_database(), rebuild=rebuild)
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="Drop and recreate indexes whose options changed")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args.rebuild))
+
+    print("=" * 60)
+    print("🔍 MONGODB INDEX PLAN")
+    print("=" * 60)
+    for outcome, count in summary.items():
+        print(f"   {outcome:<10} {count}")
+    if summary["mismatched"]:
+        print(f"⚠️  {summary['mismatched']} indexes differ from the plan; re-run with --rebuild to replace them")
+    print("=" * 60)
+    return 1 if summary["failed"] or summary["mismatched"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Login Burst Load Test: goods read latency while bcrypt logins pile up
+Times GET /api/mongo/goods/ on its own, then again while a burst of concurrent
+logins hits POST /api/mongo/auth/login. With password hashing on the bounded
+worker pool the goods percentiles should barely move; 503s mean the queue bound
+is shedding load as intended.
+
+Run against a live server (python start_server.py, or python serve.py for production
+settings) with an existing user:
+    python scripts/loadtest_login_burst.py --username testadmin --password adminpass123
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def read_goods(base_url, token, count, stop_event=None):
+    headers = {"Authorization": f"Bearer {token}"}
+    timings = []
+    session = requests.Session()
+    while len(timings) < count and not (stop_event and stop_event.is_set()):
+        started = time.perf_counter()
+        session.get(f"{base_url}/api/mongo/goods/", params={"limit": 20, "total": "none"}, headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def login(base_url, username, password):
+    started = time.perf_counter()
+    response = requests.post(f"{base_url}/api/mongo/auth/login", json={"username": username, "password": password})
+    return response.status_code, (time.perf_counter() - started) * 1000
+
+def report(label, timings):
+    print(f"   {label:<22} n={len(timings):<5} p50={percentile(timings, 0.50):7.1f} ms  "
+          f"p95={percentile(timings, 0.95):7.1f} ms  p99={percentile(timings, 0.99):7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="testadmin")
+    parser.add_argument("--password", default="adminpass123")
+    parser.add_argument("--logins", type=int, default=200, help="Logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent login clients")
+    parser.add_argument("--reads", type=int, default=200, help="Goods reads per phase")
+    args = parser.parse_args()
+
+    response = requests.post(
+        f"{args.base_url}/api/mongo/auth/login",
+        json={"username": args.username, "password": args.password},
+    )
+    if response.status_code != 200:
+        print(f"❌ Login failed with status {response.status_code}; check --username/--password")
+        return
+    token = response.json()["access_token"]
+
+    print("=" * 60)
+    print(f"🔐 LOGIN BURST LOAD TEST ({args.logins} logins, {args.concurrency} concurrent)")
+    print("=" * 60)
+
+    baseline = read_goods(args.base_url, token, args.reads)
+
+    stop_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        during_future = reader.submit(read_goods, args.base_url, token, args.reads, stop_event)
+        with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+            results = list(clients.map(lambda _: login(args.base_url, args.username, args.password), range(args.logins)))
+        stop_event.set()
+        during = during_future.result()
+
+    login_timings = [elapsed for code, elapsed in results if code == 200]
+    rejected = sum(1 for code, _ in results if code == 503)
+    failed = len(results) - len(login_timings) - rejected
+
+    print("📦 Goods reads")
+    report("baseline", baseline)
+    report("during login burst", during)
+    print("🔑 Logins")
+    report("accepted", login_timings)
+    print(f"   rejected (503): {rejected}   other failures: {failed}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,19 @@ Data Migration Script: SQLite to MongoDB Atlas
 This script migrates all existing data from the SQLite database to MongoDB Atlas.
 """
 import asyncio
+import os
 import sqlite3
+import sys
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.mongo_indexes import ensure_indexes
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -306,10 +312,11 @@ class DataMigrator:
         logger.info("🔍 Creating indexes...")
         
         try:
-            # Users collection indexes
-            await self.mongo_db.users.create_index("username", unique=True)
-            await self.mongo_db.users.create_index("email", unique=True)
-            await self.mongo_db.users.create_index("role")
+            # Users, goods and user_activities follow the application's index plan;
+            # the migration runs before the API serves traffic, so changed indexes can be rebuilt here
+            await ensure_indexes(self.mongo_db, rebuild=True)
+            
+            # Migration bookkeeping
             await self.mongo_db.users.create_index("sqlite_id")
             
             # Branches collection indexes
@@ -317,8 +324,6 @@ class DataMigrator:
             await self.mongo_db.branches.create_index("sqlite_id")
             
             # Goods collection indexes
-            await self.mongo_db.goods.create_index("name")
-            await self.mongo_db.goods.create_index("category")
             await self.mongo_db.goods.create_index("sqlite_id")
             
             # Assignments collection indexes
@@ -327,8 +332,6 @@ class DataMigrator:
             await self.mongo_db.assignments.create_index("sqlite_id")
             
             # User activities collection indexes
-            await self.mongo_db.user_activities.create_index("user_id")
-            await self.mongo_db.user_activities.create_index("timestamp")
             await self.mongo_db.user_activities.create_index("category")
             await self.mongo_db.user_activities.create_index("sqlite_id")
             
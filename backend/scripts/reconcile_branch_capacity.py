@@ -0,0 +1,44 @@
+"""
+Branch Capacity Reconciliation
+Recomputes every branch's used capacity (sum of quantity x unit_volume over its
+goods) from scratch and reports drift against the incrementally maintained
+Branch.used_capacity counter. Drift is repaired unless --dry-run is given.
+
+Run from the backend directory (e.g. nightly from cron):
+    python scripts/reconcile_branch_capacity.py [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.crud import reconcile_branch_capacity
+from app.database import SessionLocal
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing it")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drift = reconcile_branch_capacity(db, apply=not args.dry_run)
+    finally:
+        db.close()
+
+    print("=" * 60)
+    print("📦 BRANCH CAPACITY RECONCILIATION")
+    print("=" * 60)
+    if not drift:
+        print("✅ All branch counters match their goods")
+    for entry in drift:
+        print(f"   ⚠️  Branch {entry['branch_id']} ({entry['name']}): recorded {entry['recorded']:.2f}, "
+              f"actual {entry['actual']:.2f}, drift {entry['drift']:+.2f}")
+    if drift:
+        print(f"{'🔍 Found' if args.dry_run else '🔧 Repaired'} drift on {len(drift)} branches")
+    print("=" * 60)
+    return 1 if drift and args.dry_run else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Production launcher for the StockHub API.
+
+Runs uvicorn with one worker process per available CPU (container CPU quotas
+included), uvloop + httptools when installed, and keep-alive, backlog and
+graceful-shutdown settings from Settings. Every worker opens its own SQL and
+MongoDB pools, sized per process by DB_POOL_* / MONGO_*_POOL_SIZE.
+
+SQL tables are created here before the workers start. With more than one worker:
+  * missing MongoDB indexes are also created here, once, and the workers skip it;
+  * the principal and stats caches are invalidated only in the worker that made
+    the change, so their TTLs are capped at SERVER_MULTIWORKER_CACHE_TTL_SECONDS
+    (the longest a deactivated user keeps authenticating on another worker);
+  * the low-stock watcher is turned off; /low-stock is then served by the
+    partial-index query instead of N copies of the change stream.
+
+    python serve.py [--workers N] [--host HOST] [--port PORT]
+
+Use start_server.py for local development (auto-reload, single process).
+"""
+import argparse
+import asyncio
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import uvicorn
+
+from app.config import get_settings
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"  # cgroup v2: "<quota> <period>" or "max <period>"
+
+def available_cpus() -> int:
+    """CPUs this process may use: the cgroup quota if set, else the scheduler affinity"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open(CGROUP_CPU_MAX) as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+async def ensure_mongo_indexes() -> dict:
+    from app.mongo_indexes import ensure_indexes
+    from app.mongodb import close_mongo_connection, connect_to_mongo, get_database
+    await connect_to_mongo()
+    try:
+        return await ensure_indexes(get_database())
+    finally:
+        await close_mongo_connection()
+
+def worker_overrides(settings) -> dict:
+    """Environment for spawned worker processes (each re-reads Settings from it)"""
+    cap = settings.SERVER_MULTIWORKER_CACHE_TTL_SECONDS
+    overrides = {
+        "PRINCIPAL_CACHE_TTL_SECONDS": str(min(settings.PRINCIPAL_CACHE_TTL_SECONDS, cap)),
+        "STATS_CACHE_TTL_SECONDS": str(min(settings.STATS_CACHE_TTL_SECONDS, cap)),
+    }
+    if settings.MONGO_ENSURE_INDEXES:
+        overrides["MONGO_ENSURE_INDEXES"] = "false"  # done once by the supervisor
+    if settings.LOW_STOCK_WATCHER_ENABLED:
+        overrides["LOW_STOCK_WATCHER_ENABLED"] = "false"
+    return overrides
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="Worker processes (0 = one per available CPU)")
+    args = parser.parse_args()
+
+    workers = args.workers or available_cpus()
+
+    # Import once in the supervisor so a broken build fails here, not in N respawning workers,
+    # and create the SQL tables before the workers' lifespans race to do it
+    import app.main  # noqa: F401
+    from app.database import Base, engine
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    # A single worker runs in this process and keeps its own lifespan startup
+    overrides = {}
+    if workers > 1:
+        if settings.MONGO_ENSURE_INDEXES:
+            print(f"   MongoDB indexes: {asyncio.run(ensure_mongo_indexes())}")
+        overrides = worker_overrides(settings)
+        os.environ.update(overrides)
+
+    print("=" * 60)
+    print(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} [{settings.ENVIRONMENT}]")
+    print(f"   Listening on {args.host}:{args.port} with {workers} workers "
+          f"(loop={settings.SERVER_LOOP}, http={settings.SERVER_HTTP})")
+    print(f"   Per worker: SQL pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}, "
+          f"Mongo pool {settings.MONGO_MAX_POOL_SIZE}, threads {settings.THREADPOOL_TOKENS}")
+    if workers > 1:
+        print(f"   Per-process caches capped at {overrides['PRINCIPAL_CACHE_TTL_SECONDS']}s (principals) / "
+              f"{overrides['STATS_CACHE_TTL_SECONDS']}s (stats)"
+              + ("; low-stock watcher off" if "LOW_STOCK_WATCHER_ENABLED" in overrides else ""))
+    print("=" * 60)
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        lifespan="on",
+    )
+
+if __name__ == "__main__":
+    main()
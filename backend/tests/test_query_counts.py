@@ -0,0 +1,110 @@
+"""
+SQL statement budget for the crud list functions (N+1 guard).
+
+Seeds 100 rows of each model into an in-memory SQLite database, runs every
+listing under a statement counter and fails if one issues more than
+MAX_LISTING_STATEMENTS, including walking every relationship under the
+"detailed" loading profile. No server needed: python tests/test_query_counts.py
+"""
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import crud
+from app.database import Assignment, Base, Branch, Goods, User
+
+ROWS = 100
+MAX_LISTING_STATEMENTS = 3  # listing query + one selectinload per relationship
+
+@contextmanager
+def count_statements(engine):
+    """Count SQL statements sent to `engine` inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def assert_max_statements(engine, label, listing, walk=None, budget=MAX_LISTING_STATEMENTS):
+    """Run `listing()` (and `walk(rows)`) and fail if it exceeds the statement budget"""
+    with count_statements(engine) as statements:
+        rows = listing()
+        if walk:
+            for row in rows:
+                walk(row)
+    assert len(rows) == ROWS, f"{label}: expected {ROWS} rows, got {len(rows)}"
+    if len(statements) > budget:
+        raise AssertionError(f"{label}: {len(statements)} statements for {len(rows)} rows (budget {budget})")
+    print(f"✅ {label}: {len(statements)} statements for {len(rows)} rows")
+
+def seed(db):
+    users = [
+        User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x", role="employee")
+        for i in range(ROWS)
+    ]
+    db.add_all(users)
+    db.flush()
+    branches = [Branch(name=f"Branch {i}", location="Test", manager_id=users[i].id, capacity=1000) for i in range(ROWS)]
+    db.add_all(branches)
+    db.flush()
+    for user, branch in zip(users, branches):
+        user.branch_id = branch.id
+    db.add_all(
+        Goods(name=f"Goods {i}", quantity=1, price_per_unit=1.0, owner_id=users[i].id, branch_id=branches[i].id)
+        for i in range(ROWS)
+    )
+    db.add_all(
+        Assignment(task=f"Task {i}", employee_id=users[i].id, branch_id=branches[i].id)
+        for i in range(ROWS)
+    )
+    db.commit()
+
+def main():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    seed(db)
+    db.close()
+
+    print("🔍 Statement budgets for 100-row listings")
+    print("=" * 60)
+    listings = [
+        ("users", crud.get_users, lambda user: user.branch),
+        ("goods", crud.get_goods, lambda goods: (goods.owner, goods.branch)),
+        ("branches", crud.get_branches, lambda branch: branch.manager),
+        ("assignments", crud.get_assignments, lambda assignment: (assignment.employee, assignment.branch)),
+    ]
+    for name, listing, walk in listings:
+        # Fresh session per run so nothing is served from the identity map
+        db = Session()
+        assert_max_statements(engine, f"{name} (summary)", lambda: listing(db, limit=ROWS), budget=1)
+        try:
+            walk(listing(db, limit=ROWS)[0])
+            raise AssertionError(f"{name} (summary): relationship access should raise, not lazy-load")
+        except InvalidRequestError:
+            print(f"✅ {name} (summary): lazy relationship load refused")
+        db.close()
+
+        db = Session()
+        assert_max_statements(engine, f"{name} (detailed)", lambda: listing(db, limit=ROWS, profile="detailed"), walk)
+        db.close()
+
+    print("=" * 60)
+    print("🎉 All listings within their statement budgets")
+
+if __name__ == "__main__":
+    main()
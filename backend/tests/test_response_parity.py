@@ -0,0 +1,106 @@
+"""
+Response parity check for the MongoDB mutation endpoints.
+
+Create/update endpoints no longer read the document back after writing, so
+every mutation response is compared with a fresh GET of the same document.
+Run against a live server: python tests/test_response_parity.py
+"""
+import requests
+import json
+import uuid
+
+BASE_URL = "http://127.0.0.1:8000"
+
+def document_id(payload):
+    """Goods responses carry `id`; projected item/user responses keep `_id`"""
+    return payload.get("id") or payload.get("_id")
+
+def check_parity(label, mutation_response, read_url):
+    """Mutation payload must equal what a subsequent GET returns"""
+    read_response = requests.get(read_url)
+    written = mutation_response.json()
+    stored = read_response.json()
+    if read_response.status_code == 200 and written == stored:
+        print(f"✅ {label}: response matches stored document")
+        return True
+    print(f"❌ {label}: response differs from stored document")
+    print(f"   mutation: {json.dumps(written, indent=2, sort_keys=True)}")
+    print(f"   stored:   {json.dumps(stored, indent=2, sort_keys=True)}")
+    return False
+
+def test_goods_parity():
+    print("\n📦 Testing goods create/update parity...")
+    goods_data = {
+        "name": "Parity Test Goods",
+        "category": "testing",
+        "quantity": 12,
+        "price_per_unit": 3.5,
+        "sku": f"PARITY-{uuid.uuid4().hex[:8]}"
+    }
+    response = requests.post(f"{BASE_URL}/api/mongo/goods/", json=goods_data)
+    if response.status_code != 201:
+        print(f"❌ Failed to create goods: {response.text}")
+        return False
+    goods_id = document_id(response.json())
+    url = f"{BASE_URL}/api/mongo/goods/{goods_id}"
+    results = [check_parity("goods create", response, url)]
+
+    response = requests.put(url, json={"quantity": 30, "description": "updated by parity test"})
+    results.append(response.status_code == 200 and check_parity("goods update", response, url))
+
+    response = requests.put(f"{BASE_URL}/api/mongo/goods/{'0' * 24}", json={"quantity": 1})
+    print(f"{'✅' if response.status_code == 404 else '❌'} goods update of missing id -> {response.status_code}")
+    results.append(response.status_code == 404)
+
+    requests.delete(url)
+    return all(results)
+
+def test_item_parity():
+    print("\n🔧 Testing item create/update parity...")
+    item_data = {"name": f"Parity Widget {uuid.uuid4().hex[:8]}", "quantity": 5, "price": 9.99}
+    response = requests.post(f"{BASE_URL}/api/items/", json=item_data)
+    if response.status_code != 201:
+        print(f"❌ Failed to create item: {response.text}")
+        return False
+    item_id = document_id(response.json())
+    url = f"{BASE_URL}/api/items/{item_id}"
+    results = [check_parity("item create", response, url)]
+
+    response = requests.put(url, json={"quantity": 8})
+    results.append(response.status_code == 200 and check_parity("item update", response, url))
+
+    requests.delete(url)
+    return all(results)
+
+def test_user_parity():
+    print("\n👤 Testing user create parity...")
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"parity_{suffix}",
+        "email": f"parity_{suffix}@example.com",
+        "password": "paritypass123",
+        "role": "customer"
+    }
+    response = requests.post(f"{BASE_URL}/api/mongo/users/", json=user_data)
+    if response.status_code != 201:
+        print(f"❌ Failed to create user: {response.text}")
+        return False
+    user_id = document_id(response.json())
+    # There is no delete endpoint on this router; the parity_* user is left behind
+    return check_parity("user create", response, f"{BASE_URL}/api/mongo/users/{user_id}")
+
+def main():
+    print("🚀 Response parity tests for MongoDB mutation endpoints")
+    print("=" * 60)
+    try:
+        results = [test_goods_parity(), test_item_parity(), test_user_parity()]
+        print("\n" + "=" * 60)
+        if all(results):
+            print("🎉 All mutation responses match their stored documents")
+        else:
+            print("⚠️ Some mutation responses differ from their stored documents")
+    except requests.exceptions.ConnectionError:
+        print("❌ Connection error - make sure the server is running on http://127.0.0.1:8000")
+
+if __name__ == "__main__":
+    main()